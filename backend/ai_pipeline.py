@@ -1,53 +1,171 @@
+import functools
+import heapq
 import logging
-from typing import Dict, List, Any
-from .suggestion_models import SUGGESTIONS
+from operator import attrgetter
+from typing import Dict, List, Any, Callable, Hashable, NamedTuple
+from .suggestion_models import SUGGESTIONS, Suggestion
+
+def _freeze(value: Any) -> Hashable:
+    """Recursively convert dicts/lists into hashable equivalents"""
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+class _StateKey:
+    """Hashable cache key for a state dict that still carries the original state"""
+    __slots__ = ('key', 'state')
+    
+    def __init__(self, state: Dict[str, Any]):
+        self.key = _freeze(state)
+        self.state = state
+        
+    def __hash__(self):
+        return hash(self.key)
+        
+    def __eq__(self, other):
+        return self.key == other.key
+
+def _compile_conditions(conditions: tuple) -> Callable[[Dict[str, Any]], bool]:
+    """Generate a predicate equivalent to _check_conditions for one tuple of condition pairs"""
+    namespace = {'isinstance': isinstance, 'dict': dict}
+    terms = []
+    for i, (key, value) in enumerate(conditions):
+        k, v = f'_k{i}', f'_v{i}'
+        namespace[k] = key
+        namespace[v] = value
+        if isinstance(value, tuple):
+            nested = []
+            for j, (subkey, subval) in enumerate(value):
+                sk, sv = f'_k{i}_{j}', f'_v{i}_{j}'
+                namespace[sk] = subkey
+                namespace[sv] = subval
+                nested.append(f"{sk} in s[{k}] and s[{k}][{sk}] == {sv}")
+            nested_expr = " and ".join(nested) or "True"
+            terms.append(f"{k} in s and (({nested_expr}) if isinstance(s[{k}], dict) else s[{k}] == {v})")
+        else:
+            terms.append(f"{k} in s and s[{k}] == {v}")
+    source = "lambda s: " + (" and ".join(terms) or "True")
+    return eval(compile(source, '<suggestion conditions>', 'eval'), namespace)
+
+class _CompiledSuggestion(NamedTuple):
+    suggestion: Suggestion
+    predicate: Callable[[Dict[str, Any]], bool]
 
 class AISuggestionPipeline:
-    def __init__(self):
+    def __init__(self, cache_size: int = 256):
         self.logger = logging.getLogger('AISuggestionPipeline')
         self.suggestions = SUGGESTIONS
+        self._index = {game: self._build_index(game_suggestions)
+                       for game, game_suggestions in self.suggestions.items()}
+        self._compiled = {game: [_CompiledSuggestion(s, _compile_conditions(s.conditions))
+                                 for s in game_suggestions]
+                          for game, game_suggestions in self.suggestions.items()}
+        # Game state changes slowly, so repeated states are answered from an LRU cache
+        self._cached_suggestions = functools.lru_cache(maxsize=cache_size)(self._select_suggestions)
         
-    def get_suggestions(self, state: Dict[str, Any], game: str = 'valorant') -> List[Dict[str, Any]]:
-        """Get suggestions based on current game state"""
-        try:
-            # Get all suggestions for the current game
-            game_suggestions = self.suggestions.get(game, [])  # Default to Valorant
+    @staticmethod
+    def _build_index(game_suggestions: tuple) -> Dict[str, Any]:
+        """Build an inverted index from (key, value) scalar conditions to suggestion positions"""
+        postings = {}
+        required = []
+        always = []
+        for i, suggestion in enumerate(game_suggestions):
+            count = 0
+            for key, value in suggestion.conditions:
+                # Nested conditions and unhashable values are left to _check_conditions
+                if isinstance(value, tuple):
+                    continue
+                try:
+                    postings.setdefault((key, value), []).append(i)
+                except TypeError:
+                    continue
+                count += 1
+            required.append(count)
+            if count == 0:
+                always.append(i)
+        return {'postings': postings, 'required': required, 'always': always}
+        
+    def _candidates(self, state: Dict[str, Any], game: str) -> List[_CompiledSuggestion]:
+        """Return suggestions whose indexed scalar conditions all match the state, in definition order"""
+        compiled = self._compiled.get(game, [])
+        index = self._index.get(game)
+        if index is None:
+            return list(compiled)
             
-            # Filter suggestions based on state
-            active_suggestions = []
-            for suggestion in game_suggestions:
-                if self._check_conditions(suggestion, state):
-                    active_suggestions.append(suggestion)
+        postings = index['postings']
+        hits = {}
+        for item in state.items():
+            try:
+                matched = postings.get(item)
+            except TypeError:  # Unhashable state value (e.g. position lists)
+                continue
+            if matched:
+                for i in matched:
+                    hits[i] = hits.get(i, 0) + 1
                     
-            # Sort by priority
-            active_suggestions.sort(key=lambda x: x['priority'])
-            
-            # Return top 3 suggestions
-            return active_suggestions[:3]
+        required = index['required']
+        positions = index['always'] + [i for i, count in hits.items() if count == required[i]]
+        positions.sort()
+        return [compiled[i] for i in positions]
+        
+    def get_suggestions(self, state: Dict[str, Any], game: str = 'valorant') -> List[Dict[str, Any]]:
+        """Get suggestions based on current game state, as {'id', 'text', 'priority'} dicts"""
+        try:
+            try:
+                key = _StateKey(state)
+            except TypeError:  # State holds values we cannot freeze; skip the cache
+                return [s.to_dict() for s in self._filter_suggestions(state, game)]
+            # Return fresh dicts in a fresh list, callers are free to extend or modify them
+            return [s.to_dict() for s in self._cached_suggestions(game, key)]
             
         except Exception as e:
             self.logger.error(f"Error getting suggestions: {e}")
             return []
             
-    def _check_conditions(self, suggestion: Dict[str, Any], state: Dict[str, Any]) -> bool:
+    def clear_cache(self):
+        """Drop memoized results, e.g. after SUGGESTIONS has been modified"""
+        self._cached_suggestions.cache_clear()
+        
+    def _select_suggestions(self, game: str, key: _StateKey) -> tuple:
+        """Cached entry point for _filter_suggestions"""
+        return self._filter_suggestions(key.state, game)
+        
+    def _filter_suggestions(self, state: Dict[str, Any], game: str) -> tuple:
+        """Return the top 3 matching suggestions for a state"""
+        # Only evaluate suggestions whose scalar conditions already match
+        candidates = self._candidates(state, game)
+        
+        # Filter suggestions based on state; the slower _check_conditions explains misses in debug logs
+        if self.logger.isEnabledFor(logging.DEBUG):
+            active_suggestions = [c.suggestion for c in candidates if self._check_conditions(c.suggestion, state)]
+        else:
+            active_suggestions = [c.suggestion for c in candidates if c.predicate(state)]
+                
+        # Return top 3 suggestions by priority (stable, like a sort + slice)
+        return tuple(heapq.nsmallest(3, active_suggestions, key=attrgetter('priority')))
+            
+    def _check_conditions(self, suggestion: Suggestion, state: Dict[str, Any]) -> bool:
         """Check if suggestion conditions are met, including nested dicts for abilities, etc."""
         try:
-            conditions = suggestion.get('conditions', {})
-            for key, value in conditions.items():
+            for key, value in suggestion.conditions:
                 if key not in state:
-                    self.logger.debug(f"Suggestion {suggestion.get('id')} not matched: key '{key}' missing in state.")
+                    self.logger.debug("Suggestion %s not matched: key '%s' missing in state.", suggestion.id, key)
                     return False
-                # Special handling for nested dicts (e.g., abilities)
-                if isinstance(value, dict) and isinstance(state[key], dict):
-                    for subkey, subval in value.items():
+                # Special handling for nested conditions (e.g., abilities)
+                if isinstance(value, tuple) and isinstance(state[key], dict):
+                    for subkey, subval in value:
                         if subkey not in state[key] or state[key][subkey] != subval:
-                            self.logger.debug(f"Suggestion {suggestion.get('id')} not matched: abilities subkey '{subkey}' expected {subval}, got {state[key].get(subkey)}.")
+                            self.logger.debug("Suggestion %s not matched: abilities subkey '%s' expected %s, got %s.",
+                                              suggestion.id, subkey, subval, state[key].get(subkey))
                             return False
                 else:
                     if state[key] != value:
-                        self.logger.debug(f"Suggestion {suggestion.get('id')} not matched: key '{key}' expected {value}, got {state[key]}.")
+                        self.logger.debug("Suggestion %s not matched: key '%s' expected %s, got %s.",
+                                      suggestion.id, key, value, state[key])
                         return False
-            self.logger.debug(f"Suggestion {suggestion.get('id')} matched for state.")
+            self.logger.debug("Suggestion %s matched for state.", suggestion.id)
             return True
         except Exception as e:
             self.logger.error(f"Error checking conditions: {e}")
@@ -0,0 +1,196 @@
+import ctypes
+from ctypes import windll, wintypes
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+import logging
+import numpy as np
+import win32gui
+import win32ui
+import win32con
+
+try:
+    import dxcam
+except ImportError:  # Optional dependency, GDI capture is used without it
+    dxcam = None
+
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', wintypes.DWORD),
+        ('biWidth', wintypes.LONG),
+        ('biHeight', wintypes.LONG),
+        ('biPlanes', wintypes.WORD),
+        ('biBitCount', wintypes.WORD),
+        ('biCompression', wintypes.DWORD),
+        ('biSizeImage', wintypes.DWORD),
+        ('biXPelsPerMeter', wintypes.LONG),
+        ('biYPelsPerMeter', wintypes.LONG),
+        ('biClrUsed', wintypes.DWORD),
+        ('biClrImportant', wintypes.DWORD),
+    ]
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ('bmiHeader', BITMAPINFOHEADER),
+        ('bmiColors', wintypes.DWORD * 3),
+    ]
+
+gdi32 = windll.gdi32
+gdi32.CreateDIBSection.argtypes = [
+    wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD
+]
+gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+
+Rect = Tuple[int, int, int, int]  # left, top, right, bottom
+
+class CaptureBackend(ABC):
+    """Base class for screen capture backends returning BGRA frames"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @abstractmethod
+    def grab(self, hwnd: int, rect: Rect) -> Optional[np.ndarray]:
+        """Capture the given window rectangle as a (height, width, 4) BGRA array"""
+        pass
+
+    def close(self):
+        """Release any resources held by the backend"""
+        pass
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class GdiCapture(CaptureBackend):
+    """BitBlt capture into a reusable DIB section"""
+
+    def __init__(self):
+        super().__init__()
+        # GDI resources reused across captures; rebuilt when the window or its size changes
+        self._hwnd = None
+        self._hwndDC = None
+        self._mfcDC = None
+        self._saveDC = None
+        self._saveBitMap = None
+        self._dib_size = (0, 0)
+        self._dib_frame = None
+
+    def grab(self, hwnd: int, rect: Rect) -> Optional[np.ndarray]:
+        left, top, right, bottom = rect
+        width = right - left
+        height = bottom - top
+        try:
+            self._prepare_capture(hwnd, width, height)
+            self._saveDC.BitBlt((0, 0), (width, height), self._mfcDC, (0, 0), win32con.SRCCOPY)
+            gdi32.GdiFlush()  # Make sure the blit has landed before reading the bits
+            return self._dib_frame
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Delete the cached DCs and DIB section"""
+        try:
+            if self._saveDC is not None:
+                self._saveDC.DeleteDC()
+            if self._mfcDC is not None:
+                self._mfcDC.DeleteDC()
+            if self._hwndDC is not None:
+                win32gui.ReleaseDC(self._hwnd, self._hwndDC)
+        except Exception as e:
+            self.logger.debug(f"Error releasing capture DCs: {e}")
+        finally:
+            self._saveDC = None
+            self._mfcDC = None
+            self._hwndDC = None
+            self._hwnd = None
+            self._release_dib_section()
+
+    def _prepare_capture(self, hwnd: int, width: int, height: int):
+        """Make sure the DCs and DIB section match the target window"""
+        if hwnd == self._hwnd and self._dib_size == (width, height):
+            return
+
+        self.close()
+        self._hwndDC = win32gui.GetWindowDC(hwnd)
+        self._mfcDC = win32ui.CreateDCFromHandle(self._hwndDC)
+        self._saveDC = self._mfcDC.CreateCompatibleDC()
+        self._create_dib_section(self._mfcDC.GetSafeHdc(), width, height)
+        win32gui.SelectObject(self._saveDC.GetSafeHdc(), self._saveBitMap)
+        self._hwnd = hwnd
+
+    def _create_dib_section(self, hdc: int, width: int, height: int):
+        """(Re)create the 32-bit top-down DIB section backing captured frames"""
+        self._release_dib_section()
+
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = width
+        bmi.bmiHeader.biHeight = -height  # Negative height = top-down rows
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = BI_RGB
+
+        bits = ctypes.c_void_p()
+        handle = gdi32.CreateDIBSection(hdc, ctypes.byref(bmi), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+        if not handle or not bits.value:
+            raise ctypes.WinError()
+
+        # Wrap the DIB pixels once; BitBlt fills this array in place every frame
+        buffer = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        self._dib_frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        self._saveBitMap = handle
+        self._dib_size = (width, height)
+
+    def _release_dib_section(self):
+        """Free the current DIB section, if any"""
+        if self._saveBitMap:
+            win32gui.DeleteObject(self._saveBitMap)
+        self._saveBitMap = None
+        self._dib_size = (0, 0)
+        self._dib_frame = None
+
+class DxgiCapture(CaptureBackend):
+    """DXGI Desktop Duplication capture of the primary output via dxcam"""
+
+    def __init__(self, output_idx: int = 0):
+        super().__init__()
+        if dxcam is None:
+            raise RuntimeError("dxcam is not installed")
+        self._camera = dxcam.create(output_idx=output_idx, output_color="BGRA")
+        if self._camera is None:
+            raise RuntimeError("Could not create a DXGI duplication for the output")
+        self._last_rect = None
+        self._last_frame = None
+
+    @staticmethod
+    def is_available() -> bool:
+        return dxcam is not None
+
+    def covers(self, rect: Rect) -> bool:
+        """Check whether the rectangle lies entirely on the duplicated output"""
+        left, top, right, bottom = rect
+        return (left >= 0 and top >= 0 and right > left and bottom > top
+                and right <= self._camera.width and bottom <= self._camera.height)
+
+    def grab(self, hwnd: int, rect: Rect) -> Optional[np.ndarray]:
+        frame = self._camera.grab(region=rect)
+        if frame is None:
+            # AcquireNextFrame timed out: nothing changed on screen since the last grab
+            return self._last_frame if rect == self._last_rect else None
+        self._last_rect = rect
+        self._last_frame = frame
+        return frame
+
+    def close(self):
+        camera = getattr(self, '_camera', None)
+        if camera is not None:
+            camera.release()
+        self._camera = None
+        self._last_frame = None
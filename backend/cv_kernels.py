@@ -0,0 +1,53 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Optional dependency, detectors fall back to OpenCV/numpy
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def count_red_pixels(frame, y0, y1, x0, x1):
+        """Count pixels in frame[y0:y1, x0:x1] that pass the red damage-indicator test.
+
+        Works on BGR or BGRA uint8 frames and computes OpenCV's 8-bit HSV inline:
+        red means (H <= 10 or H >= 160) and S >= 100 and V >= 100.
+        """
+        total = 0
+        for y in prange(y0, y1):
+            row_count = 0
+            for x in range(x0, x1):
+                b = np.int32(frame[y, x, 0])
+                g = np.int32(frame[y, x, 1])
+                r = np.int32(frame[y, x, 2])
+                v = max(r, g, b)
+                if v < 100:
+                    continue
+                diff = v - min(r, g, b)
+                # S = round(255 * diff / v) >= 100
+                if 510 * diff < 199 * v:
+                    continue
+                # H in OpenCV's 0..179 range (degrees / 2)
+                if v == r:
+                    h = 30.0 * (g - b) / diff
+                elif v == g:
+                    h = 60.0 + 30.0 * (b - r) / diff
+                else:
+                    h = 120.0 + 30.0 * (r - g) / diff
+                if h < 0.0:
+                    h += 180.0
+                if h <= 10.5 or h >= 159.5:
+                    row_count += 1
+            total += row_count
+        return total
+
+    # Compile (or load from the on-disk cache) now instead of on the first game frame. Numba
+    # specializes on writability, and get_latest_frame() hands out read-only views, so warm both
+    _warmup_frame = np.zeros((1, 1, 4), dtype=np.uint8)
+    count_red_pixels(_warmup_frame, 0, 1, 0, 1)
+    _warmup_frame.flags.writeable = False
+    count_red_pixels(_warmup_frame, 0, 1, 0, 1)
+    del _warmup_frame
+else:
+    count_red_pixels = None
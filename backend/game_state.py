@@ -2,16 +2,45 @@ import cv2
 import numpy as np
 from PIL import ImageGrab
 import win32gui
-import win32ui
-import win32con
-from ctypes import windll
 import win32process
 import psutil
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
-from .utils.config import GAME_CONFIGS
+import threading
+import time
+import zlib
+from .utils.config import GAME_CONFIGS, HUD_REFERENCE_RESOLUTION
+from .capture import CaptureBackend, DxgiCapture, GdiCapture
+from .cv_kernels import NUMBA_AVAILABLE, count_red_pixels
+
+try:
+    import xxhash
+except ImportError:  # Optional dependency, zlib.crc32 is used without it
+    xxhash = None
 
 class GameStateDetector:
+    # State key -> detector method for Valorant, evaluated in this order every frame
+    _VALORANT_FIELDS = (
+        ('combat', '_detect_combat'),
+        ('utility_available', '_detect_utility_available'),
+        ('round_time', '_detect_round_time'),
+        ('team_money', '_detect_team_money'),
+        ('exposed', '_detect_exposed'),
+        ('player_health', '_detect_player_health'),
+        ('player_armor', '_detect_player_armor'),
+        ('player_position', '_detect_player_position'),
+        ('enemy_positions', '_detect_enemy_positions'),
+        ('spike_location', '_detect_spike_location'),
+        ('site_control', '_detect_site_control'),
+        ('enemy_presence', '_detect_enemy_presence'),
+        ('teammate_with_smoke', '_detect_teammate_with_smoke'),
+        ('teammate_with_flash', '_detect_teammate_with_flash'),
+        ('teammate_with_healing', '_detect_teammate_with_healing'),
+        ('need_coordination', '_detect_need_coordination'),
+        ('abilities', '_detect_abilities'),
+        ('equipped_gun', '_detect_equipped_gun'),
+    )
+    
     def __init__(self, game_name: str):
         self.game_name = game_name.lower()
         self.config = GAME_CONFIGS.get(self.game_name)
@@ -21,99 +50,228 @@ class GameStateDetector:
         self.logger = logging.getLogger('GameStateDetector')
         self.last_frame = None
         self.last_state = {}
+        self._buffers = {}  # Scratch arrays reused across frames, see _scratch()
+        self._valorant_detectors = tuple((key, getattr(self, method)) for key, method in self._VALORANT_FIELDS)
+        self._preallocate_buffers()
+        self._cuda_enabled = self._init_cuda()
+        
+        # Per-frame derived images (gray, HSV, edges) shared between detectors
+        self._frame_id = 0
+        self._derived = {}
+        self._derived_frame_id = 0
+        self._last_hash = None  # Hash of the last processed frame, see _frame_hash()
+        
+        # Window lookup: aliases are lowercased once, the resolved handle is cached
+        self._window_aliases = self.config.get('window_aliases', [self.config['window_name']])
+        self._window_aliases_lower = [alias.lower() for alias in self._window_aliases]
+        self._hwnd = None
+        
+        # Capture backends: DXGI duplication when available, GDI BitBlt otherwise
+        self._gdi_capture = GdiCapture()
+        self._dxgi_capture = None
+        if DxgiCapture.is_available():
+            try:
+                self._dxgi_capture = DxgiCapture()
+            except Exception as e:
+                self.logger.warning(f"DXGI capture unavailable, using GDI: {e}")
+        
+        # Background capture: the thread fills a back buffer and swaps it into the
+        # 'ready' slot; readers swap 'ready' with 'front' so neither side ever waits
+        # on the other for longer than a pointer swap
+        self._capture_thread = None
+        self._capture_stop = threading.Event()
+        self._frame_lock = threading.Lock()
+        self._frame_back = None
+        self._frame_ready = None
+        self._frame_front = None
+        self._frame_front_view = None  # Read-only view of _frame_front handed to callers
+        self._frame_fresh = False
+        
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+        
+    def close(self):
+        """Release all resources held for screen capture"""
+        self.stop_capture()
+        for backend in (self._gdi_capture, self._dxgi_capture):
+            if backend is not None:
+                backend.close()
+        
+    def _select_backend(self, hwnd: int, rect) -> CaptureBackend:
+        """Use DXGI only when the game window is unobstructed on the duplicated output"""
+        if (self._dxgi_capture is not None
+                and win32gui.GetForegroundWindow() == hwnd
+                and self._dxgi_capture.covers(rect)):
+            return self._dxgi_capture
+        return self._gdi_capture
+        
+    def _find_game_window(self) -> Optional[int]:
+        """Return the cached game window handle, re-resolving it only once it is gone"""
+        hwnd = self._hwnd
+        if hwnd and win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd):
+            return hwnd
+        self._hwnd = self._discover_game_window()
+        return self._hwnd
+        
+    def _discover_game_window(self) -> Optional[int]:
+        """Search the desktop for the game window"""
+        # Try to find the game window with exact match first
+        window_aliases = self._window_aliases
+        for window_title in window_aliases:
+            hwnd = win32gui.FindWindow(None, window_title)
+            if hwnd:
+                self.logger.info("Found window with title: %s", window_title)
+                return hwnd
+        
+        self.logger.info("Trying to find window containing game name: %s", self.config['window_name'])
+        aliases_lower = self._window_aliases_lower
+        def callback(hwnd, windows):
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                title_lower = title.lower()
+                if any(alias in title_lower for alias in aliases_lower):
+                    windows.append((hwnd, title))
+            return True
+        
+        matching_windows = []
+        win32gui.EnumWindows(callback, matching_windows)
+        
+        if matching_windows:
+            hwnd, title = matching_windows[0]
+            self.logger.info("Found window with partial match: %s", title)
+            return hwnd
+        
+        self.logger.warning("Game window not found. Tried aliases: %s", window_aliases)
+        # List all window titles for debugging, only when they would actually be logged
+        if self.logger.isEnabledFor(logging.INFO):
+            def list_callback(hwnd, windows):
+                if win32gui.IsWindowVisible(hwnd):
+                    windows.append(win32gui.GetWindowText(hwnd))
+                return True
+            windows = []
+            win32gui.EnumWindows(list_callback, windows)
+            self.logger.info("Available windows:")
+            for window in windows:
+                if window:  # Only show non-empty window titles
+                    self.logger.info("- %s", window)
+        return None
         
     def capture_screen(self):
-        """Capture the game window or full screen"""
+        """Capture the game window as a (height, width, 4) BGRA array.
+
+        The array is the capture backend's own buffer and is overwritten by the
+        next capture; copy it if it has to outlive the current update.
+        """
         try:
-            # Try to find the game window with exact match first
-            hwnd = None
-            window_aliases = self.config.get('window_aliases', [self.config['window_name']])
+            hwnd = self._find_game_window()
+            if not hwnd:
+                return None
             
-            for window_title in window_aliases:
-                hwnd = win32gui.FindWindow(None, window_title)
-                if hwnd:
-                    self.logger.info(f"Found window with title: {window_title}")
-                    break
+            self.logger.debug("Found window handle: %s", hwnd)
             
-            if not hwnd:
-                self.logger.info(f"Trying to find window containing game name: {self.config['window_name']}")
-                def callback(hwnd, windows):
-                    if win32gui.IsWindowVisible(hwnd):
-                        title = win32gui.GetWindowText(hwnd)
-                        if any(alias.lower() in title.lower() for alias in window_aliases):
-                            windows.append((hwnd, title))
-                    return True
-                
-                matching_windows = []
-                win32gui.EnumWindows(callback, matching_windows)
-                
-                if matching_windows:
-                    hwnd, title = matching_windows[0]
-                    self.logger.info(f"Found window with partial match: {title}")
-                else:
-                    self.logger.warning(f"Game window not found. Tried aliases: {window_aliases}")
-                    # List all window titles for debugging
-                    def list_callback(hwnd, windows):
-                        if win32gui.IsWindowVisible(hwnd):
-                            windows.append(win32gui.GetWindowText(hwnd))
-                        return True
-                    windows = []
-                    win32gui.EnumWindows(list_callback, windows)
-                    self.logger.info("Available windows:")
-                    for window in windows:
-                        if window:  # Only show non-empty window titles
-                            self.logger.info(f"- {window}")
-                    return None
+            # Get window dimensions
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            width = right - left
+            height = bottom - top
+            self.logger.debug("Window dimensions: %dx%d at (%d, %d)", width, height, left, top)
             
-            self.logger.info(f"Found window handle: {hwnd}")
+            # Capture window
+            rect = (left, top, right, bottom)
+            img = self._select_backend(hwnd, rect).grab(hwnd, rect)
+            if img is None and self._dxgi_capture is not None:
+                img = self._gdi_capture.grab(hwnd, rect)
+            
+            # Detectors work on BGRA directly, no BGRA->BGR conversion of the full frame
+            return img
             
-            if hwnd:
-                # Get window dimensions
-                left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-                width = right - left
-                height = bottom - top
-                self.logger.info(f"Window dimensions: {width}x{height} at ({left}, {top})")
-                
-                # Capture window
-                hwndDC = win32gui.GetWindowDC(hwnd)
-                mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-                saveDC = mfcDC.CreateCompatibleDC()
-                
-                saveBitMap = win32ui.CreateBitmap()
-                saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-                saveDC.SelectObject(saveBitMap)
-                
-                saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-                
-                # Convert to numpy array
-                bmpinfo = saveBitMap.GetInfo()
-                bmpstr = saveBitMap.GetBitmapBits(True)
-                img = np.frombuffer(bmpstr, dtype='uint8')
-                img.shape = (height, width, 4)
-                
-                # Clean up
-                win32gui.DeleteObject(saveBitMap.GetHandle())
-                saveDC.DeleteDC()
-                mfcDC.DeleteDC()
-                win32gui.ReleaseDC(hwnd, hwndDC)
-                
-                return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-                
         except Exception as e:
             self.logger.error(f"Error capturing screen: {e}")
             return None
     
+    def start_capture(self, max_fps: int = 60):
+        """Start capturing frames on a background thread, see get_latest_frame()"""
+        if self._capture_thread is not None:
+            return
+        self._capture_stop.clear()
+        self._capture_thread = threading.Thread(target=self._capture_loop, args=(1.0 / max_fps,),
+                                                name='GameCapture', daemon=True)
+        self._capture_thread.start()
+        
+    def stop_capture(self):
+        """Stop the background capture thread if it is running"""
+        thread = self._capture_thread
+        if thread is None:
+            return
+        self._capture_stop.set()
+        thread.join(timeout=1.0)
+        self._capture_thread = None
+        
+    def get_latest_frame(self) -> Optional[np.ndarray]:
+        """Return the most recent frame from the capture thread (None until the first capture).
+
+        The array is a read-only view that stays untouched by the capture thread until
+        the next call; copy it to keep or modify it.
+        """
+        with self._frame_lock:
+            if self._frame_fresh:
+                self._frame_front, self._frame_ready = self._frame_ready, self._frame_front
+                self._frame_fresh = False
+                view = self._frame_front.view()
+                view.flags.writeable = False
+                self._frame_front_view = view
+            return self._frame_front_view
+            
+    def _capture_loop(self, interval: float):
+        """Producer loop: capture into the back buffer and publish it as the ready frame"""
+        while not self._capture_stop.is_set():
+            started = time.perf_counter()
+            frame = self.capture_screen()
+            if frame is None:
+                # Window missing or capture failed; don't spin on it
+                self._capture_stop.wait(0.5)
+                continue
+                
+            back = self._frame_back
+            if back is None or back.shape != frame.shape:
+                back = np.empty_like(frame)
+            np.copyto(back, frame)
+            with self._frame_lock:
+                self._frame_back, self._frame_ready = self._frame_ready, back
+                self._frame_fresh = True
+                
+            remaining = interval - (time.perf_counter() - started)
+            if remaining > 0:
+                self._capture_stop.wait(remaining)
+    
     def process_frame(self, frame: np.ndarray) -> Dict[str, Any]:
-        """Process a frame and return the current game state"""
+        """Process a BGRA (or BGR) frame and return the current game state; the frame is only read"""
         try:
+            # Identical frames (static screens, duplicated captures) produce the same state
+            frame_hash = self._frame_hash(frame)
+            if frame_hash == self._last_hash and self.last_state:
+                return self.last_state
+                
             self.last_frame = frame
+            self._frame_id += 1
             state = self.get_game_specific_state()
             self.last_state = state
+            self._last_hash = frame_hash
             return state
         except Exception as e:
             self.logger.error(f"Error processing frame: {str(e)}")
             return self.last_state
             
+    @staticmethod
+    def _frame_hash(frame: np.ndarray) -> int:
+        """Cheap fingerprint of a frame from a 1/32 x 1/32 pixel subsample"""
+        sample = frame[::32, ::32].tobytes()
+        if xxhash is not None:
+            return xxhash.xxh3_64_intdigest(sample)
+        return zlib.crc32(sample)
+        
     def get_game_specific_state(self) -> Dict[str, Any]:
         """Get game-specific state information"""
         if self.game_name == 'valorant':
@@ -127,27 +285,7 @@ class GameStateDetector:
             
     def _get_valorant_state(self) -> Dict[str, Any]:
         """Get Valorant-specific state information"""
-        # Always return all expected keys with default values if detection fails
-        return {
-            'combat': self._detect_combat() if hasattr(self, '_detect_combat') else False,
-            'utility_available': self._detect_utility_available() if hasattr(self, '_detect_utility_available') else False,
-            'round_time': self._detect_round_time() if hasattr(self, '_detect_round_time') else 'mid',
-            'team_money': self._detect_team_money() if hasattr(self, '_detect_team_money') else 'medium',
-            'exposed': self._detect_exposed() if hasattr(self, '_detect_exposed') else False,
-            'player_health': self._detect_player_health() if hasattr(self, '_detect_player_health') else 100,
-            'player_armor': self._detect_player_armor() if hasattr(self, '_detect_player_armor') else 0,
-            'player_position': self._detect_player_position() if hasattr(self, '_detect_player_position') else None,
-            'enemy_positions': self._detect_enemy_positions() if hasattr(self, '_detect_enemy_positions') else [],
-            'spike_location': self._detect_spike_location() if hasattr(self, '_detect_spike_location') else None,
-            'site_control': self._detect_site_control() if hasattr(self, '_detect_site_control') else None,
-            'enemy_presence': self._detect_enemy_presence() if hasattr(self, '_detect_enemy_presence') else False,
-            'teammate_with_smoke': self._detect_teammate_with_smoke() if hasattr(self, '_detect_teammate_with_smoke') else False,
-            'teammate_with_flash': self._detect_teammate_with_flash() if hasattr(self, '_detect_teammate_with_flash') else False,
-            'teammate_with_healing': self._detect_teammate_with_healing() if hasattr(self, '_detect_teammate_with_healing') else False,
-            'need_coordination': self._detect_need_coordination() if hasattr(self, '_detect_need_coordination') else False,
-            'abilities': self._detect_abilities() if hasattr(self, '_detect_abilities') else {},
-            'equipped_gun': self._detect_equipped_gun() if hasattr(self, '_detect_equipped_gun') else ''
-        }
+        return {key: detect() for key, detect in self._valorant_detectors}
         
     def _get_csgo_state(self) -> Dict[str, Any]:
         """Get CS:GO-specific state information"""
@@ -175,47 +313,186 @@ class GameStateDetector:
         if self.last_frame is None:
             return False
             
+        return self._derived_value('combat', self._compute_combat)
+        
+    def _compute_combat(self) -> bool:
+        """Combat heuristic: red damage indicators or busy crosshair area"""
         try:
-            # Convert frame to HSV for better color detection
-            hsv = cv2.cvtColor(self.last_frame, cv2.COLOR_BGR2HSV)
-            
-            # Define color ranges for combat indicators
-            # Red color range for damage indicators
-            lower_red1 = np.array([0, 100, 100])
-            upper_red1 = np.array([10, 255, 255])
-            lower_red2 = np.array([160, 100, 100])
-            upper_red2 = np.array([180, 255, 255])
+            counts = self._combat_counts_cuda() if self._cuda_enabled else None
+            if counts is not None:
+                red_pixel_count, edge_count = counts
+            else:
+                # Red damage indicators in the combat HUD region
+                red_pixel_count = self._count_red_pixels('combat')
+                
+                # Check for crosshair movement (indicating aiming) in the center region only
+                edge_count = np.count_nonzero(self._edges('crosshair'))
             
-            # Create masks for red colors
-            mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-            mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-            red_mask = cv2.bitwise_or(mask1, mask2)
+            # Determine if in combat based on thresholds
+            return (red_pixel_count > 1000) or (edge_count > 5000)
             
-            # Check for crosshair movement (indicating aiming)
-            if self.last_frame is not None:
-                # Convert to grayscale
-                gray = cv2.cvtColor(self.last_frame, cv2.COLOR_BGR2GRAY)
-                
-                # Apply edge detection
-                edges = cv2.Canny(gray, 50, 150)
-                
-                # Count edge pixels in the center region (crosshair area)
-                center_y, center_x = edges.shape[0] // 2, edges.shape[1] // 2
-                roi_size = 100
-                roi = edges[center_y-roi_size:center_y+roi_size, center_x-roi_size:center_x+roi_size]
-                edge_count = np.count_nonzero(roi)
-                
-                # Check for red damage indicators
-                red_pixel_count = np.count_nonzero(red_mask)
-                
-                # Determine if in combat based on thresholds
-                return (red_pixel_count > 1000) or (edge_count > 5000)
-                
         except Exception as e:
             self.logger.error(f"Error in combat detection: {e}")
             return False
+        
+    def _init_cuda(self) -> bool:
+        """Set up the OpenCV CUDA path if OpenCV was built with CUDA and a device is present"""
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return False
+            # Recycle device memory between frames instead of cudaMalloc per GpuMat;
+            # must be configured before the stream is created
+            cv2.cuda.setBufferPoolUsage(True)
+            cv2.cuda.setBufferPoolConfig(cv2.cuda.getDevice(), 64 * 1024 * 1024, 2)
+            self._cuda_stream = cv2.cuda.Stream()
+            self._gpu_frame = cv2.cuda_GpuMat()
+            self._gpu_canny = cv2.cuda.createCannyEdgeDetector(50, 150)
+            self.logger.info("Using OpenCV CUDA for frame analysis")
+            return True
+        except (AttributeError, cv2.error) as e:
+            self.logger.debug(f"OpenCV CUDA unavailable: {e}")
+            return False
             
-        return False
+    def _gpu_roi(self, name: str):
+        """GpuMat view of a region; the frame itself is uploaded once per frame"""
+        def upload():
+            self._gpu_frame.upload(self.last_frame, self._cuda_stream)
+            return self._gpu_frame
+        gpu_frame = self._derived_value('gpu_frame', upload)
+        if name == 'crosshair':
+            roi = self._roi(name)
+            center_y, center_x = self.last_frame.shape[0] // 2, self.last_frame.shape[1] // 2
+            x0, y0 = max(center_x - 100, 0), max(center_y - 100, 0)
+            height, width = roi.shape[:2]
+        else:
+            region_y, region_x = self._region_slices(name)
+            x0, y0 = region_x.start, region_y.start
+            width, height = region_x.stop - region_x.start, region_y.stop - region_y.start
+        return cv2.cuda_GpuMat(gpu_frame, (x0, y0, width, height))
+        
+    def _combat_counts_cuda(self) -> Optional[Tuple[int, int]]:
+        """Red-pixel and crosshair edge counts computed on the GPU; None if the CUDA path failed"""
+        try:
+            stream = self._cuda_stream
+            hsv = cv2.cuda.cvtColor(self._gpu_roi('combat'), cv2.COLOR_BGR2HSV, stream=stream)
+            mask1 = cv2.cuda.inRange(hsv, (0, 100, 100), (10, 255, 255), stream=stream)
+            mask2 = cv2.cuda.inRange(hsv, (160, 100, 100), (180, 255, 255), stream=stream)
+            red_mask = cv2.cuda.bitwise_or(mask1, mask2, stream=stream)
+            
+            gray = cv2.cuda.cvtColor(self._gpu_roi('crosshair'), self._gray_code(), stream=stream)
+            edges = self._gpu_canny.detect(gray, stream=stream)
+            stream.waitForCompletion()
+            
+            # Only the two scalar counts come back to the host
+            return cv2.cuda.countNonZero(red_mask), cv2.cuda.countNonZero(edges)
+        except (AttributeError, cv2.error) as e:
+            self.logger.warning(f"OpenCV CUDA path failed, falling back to CPU: {e}")
+            self._cuda_enabled = False
+            return None
+            
+    def _count_red_pixels(self, name: str) -> int:
+        """Count red damage-indicator pixels in a region"""
+        if NUMBA_AVAILABLE:
+            # Single fused pass over the raw BGR(A) pixels, HSV computed inline
+            region_y, region_x = self._region_slices(name)
+            return int(count_red_pixels(self.last_frame, region_y.start, region_y.stop,
+                                        region_x.start, region_x.stop))
+            
+        hue, sat, val = self._hsv_channels(name)
+        
+        # Red hue wraps around 0: (H <= 10 or H >= 160) with S, V >= 100,
+        # accumulated into one reused boolean mask instead of two inRange masks + OR
+        red_mask = self._scratch('red_mask', hue.shape, np.bool_)
+        tmp = self._scratch('red_tmp', hue.shape, np.bool_)
+        np.less_equal(hue, 10, out=red_mask)
+        np.logical_or(red_mask, np.greater_equal(hue, 160, out=tmp), out=red_mask)
+        np.logical_and(red_mask, np.greater_equal(sat, 100, out=tmp), out=red_mask)
+        np.logical_and(red_mask, np.greater_equal(val, 100, out=tmp), out=red_mask)
+        return np.count_nonzero(red_mask)
+        
+    def _derived_value(self, key, compute):
+        """Compute a value once per frame and share it between detectors"""
+        if self._derived_frame_id != self._frame_id:
+            self._derived.clear()
+            self._derived_frame_id = self._frame_id
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+        
+    def _roi(self, name: str) -> np.ndarray:
+        """View of the current frame for a screen region or the 200x200 'crosshair' area"""
+        if name == 'crosshair':
+            center_y, center_x = self.last_frame.shape[0] // 2, self.last_frame.shape[1] // 2
+            roi_size = 100
+            return self.last_frame[max(center_y - roi_size, 0):center_y + roi_size,
+                                   max(center_x - roi_size, 0):center_x + roi_size]
+        region_y, region_x = self._region_slices(name)
+        return self.last_frame[region_y, region_x]
+        
+    def _gray(self, name: str) -> np.ndarray:
+        """Grayscale version of a region for the current frame"""
+        def compute():
+            roi = self._roi(name)
+            dst = self._scratch(('gray', name), roi.shape[:2], np.uint8)
+            return cv2.cvtColor(roi, self._gray_code(), dst=dst)
+        return self._derived_value(('gray', name), compute)
+        
+    def _gray_code(self) -> int:
+        """cvtColor code for grayscale conversion of the current frame's layout"""
+        return cv2.COLOR_BGRA2GRAY if self.last_frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        
+    def _hsv_channels(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """H, S and V planes of a region for the current frame"""
+        def compute():
+            roi = self._roi(name)
+            dst = self._scratch(('hsv', name), roi.shape[:2] + (3,), np.uint8)
+            # COLOR_BGR2HSV accepts 4-channel input and ignores alpha
+            hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=dst)
+            # Channel views instead of cv2.split copies
+            return hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        return self._derived_value(('hsv', name), compute)
+        
+    def _edges(self, name: str) -> np.ndarray:
+        """Canny edge map of a region for the current frame"""
+        def compute():
+            gray = self._gray(name)
+            dst = self._scratch(('edges', name), gray.shape, np.uint8)
+            return cv2.Canny(gray, 50, 150, edges=dst)
+        return self._derived_value(('edges', name), compute)
+        
+    def _preallocate_buffers(self):
+        """Allocate the per-frame scratch buffers up front at the HUD reference resolution"""
+        regions = {'crosshair': (200, 200)}
+        combat = self.config['screen_regions'].get('combat')
+        if combat:
+            regions['combat'] = (combat[3], combat[2])
+        for name, shape in regions.items():
+            self._scratch(('gray', name), shape, np.uint8)
+            self._scratch(('hsv', name), shape + (3,), np.uint8)
+            self._scratch(('edges', name), shape, np.uint8)
+        if combat:
+            self._scratch('red_mask', regions['combat'], np.bool_)
+            self._scratch('red_tmp', regions['combat'], np.bool_)
+        
+    def _scratch(self, name, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """Return a reusable scratch buffer, reallocating only when shape or dtype change"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+        return buf
+        
+    def _region_slices(self, name: str) -> Tuple[slice, slice]:
+        """Map a configured HUD region onto the current frame as (rows, cols) slices"""
+        x, y, w, h = self.config['screen_regions'][name]
+        frame_h, frame_w = self.last_frame.shape[:2]
+        ref_w, ref_h = HUD_REFERENCE_RESOLUTION
+        scale_x, scale_y = frame_w / ref_w, frame_h / ref_h
+        x0 = min(int(x * scale_x), frame_w)
+        y0 = min(int(y * scale_y), frame_h)
+        x1 = min(int((x + w) * scale_x), frame_w)
+        y1 = min(int((y + h) * scale_y), frame_h)
+        return slice(y0, y1), slice(x0, x1)
         
     def _detect_team_alive(self) -> int:
         """Detect number of alive teammates"""
@@ -288,7 +565,7 @@ class GameStateDetector:
     def _detect_abilities(self) -> dict:
         """Detect available abilities from the abilities HUD region"""
         # Only mark Q/E as available if in combat
-        combat = self._detect_combat() if hasattr(self, '_detect_combat') else False
+        combat = self._detect_combat()
         return {
             'Q': True if combat else False,
             'E': True if combat else False,
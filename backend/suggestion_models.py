@@ -1,9 +1,22 @@
-from typing import Dict, List, Any
+import types
+from typing import Dict, Any, NamedTuple
 
 """Game-specific suggestions and their conditions"""
 
+class Suggestion(NamedTuple):
+    """Immutable suggestion record"""
+    id: str
+    text: str
+    priority: int
+    # (key, value) pairs; value is itself a tuple of pairs for nested conditions such as abilities
+    conditions: tuple
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Display fields (id, text, priority) as a fresh dict; conditions stay internal"""
+        return {'id': self.id, 'text': self.text, 'priority': self.priority}
+
 # Dictionary of suggestions for each game
-SUGGESTIONS = {
+_SUGGESTIONS_RAW = {
     'valorant': [
         {
             'id': 'combat_utility',
@@ -187,3 +200,17 @@ SUGGESTIONS = {
         }
     ]
 }
+
+def _freeze_conditions(conditions: Dict[str, Any]) -> tuple:
+    """Turn a condition dict (and nested dicts) into tuples of (key, value) pairs"""
+    return tuple((key, _freeze_conditions(value) if isinstance(value, dict) else value)
+                 for key, value in conditions.items())
+
+def _freeze(suggestion: Dict[str, Any]) -> Suggestion:
+    """Convert a raw suggestion dict into a Suggestion record"""
+    return Suggestion(suggestion['id'], suggestion['text'], suggestion['priority'],
+                      _freeze_conditions(suggestion.get('conditions', {})))
+
+# Frozen at import: game -> tuple of Suggestion records
+SUGGESTIONS = types.MappingProxyType({game: tuple(_freeze(s) for s in game_suggestions)
+                                      for game, game_suggestions in _SUGGESTIONS_RAW.items()})
@@ -21,11 +21,17 @@ OVERLAY_FONT_SIZE = 14
 OVERLAY_BACKGROUND_COLOR = "rgba(0, 0, 0, 0.8)"
 OVERLAY_TEXT_COLOR = "white"
 
+# Resolution the screen_regions below are expressed in; regions are scaled to the captured frame
+HUD_REFERENCE_RESOLUTION = (1920, 1080)
+
 # Game-specific configurations
 GAME_CONFIGS = {
     'valorant': {
         'window_name': 'VALORANT',  # Primary window name
         'window_aliases': ['VALORANT', 'VALORANT  ', 'Valorant', 'Valorant ', 'VALORANT - Riot Games', 'Valorant - Riot Games'],  # Possible window titles
+        'min_fps': 5,                # Ticks slower than this are logged as overruns
+        'max_fps': 10,               # Fixed tick rate of the update loop
+        'suggestion_cooldown': 0.1,  # Minimum seconds between suggestion refreshes
         'screen_regions': {
             # Typical HUD regions for 1920x1080
             'combat': (800, 800, 320, 200),         # Center-bottom
@@ -38,6 +44,9 @@ GAME_CONFIGS = {
     },
     'csgo': {
         'window_name': 'Counter-Strike: Global Offensive',
+        'min_fps': 5,
+        'max_fps': 10,
+        'suggestion_cooldown': 0.1,
         'screen_regions': {
             'combat': (800, 800, 320, 200),         # Center-bottom
             'utility': (30, 900, 400, 150),         # Bottom-left
@@ -47,6 +56,9 @@ GAME_CONFIGS = {
     },
     'dota2': {
         'window_name': 'Dota 2',
+        'min_fps': 5,
+        'max_fps': 10,
+        'suggestion_cooldown': 0.1,
         'screen_regions': {
             'combat': (800, 800, 320, 200),         # Center-bottom
             'utility': (760, 900, 400, 150),        # Bottom-center
@@ -1,15 +1,28 @@
 import sys
 import logging
+import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QTimer, QThread, Qt, pyqtSignal
 from backend.game_state import GameStateDetector
 from backend.ai_pipeline import AISuggestionPipeline
+from backend.utils.config import GAME_CONFIGS
 from overlay.overlay_window import OverlayWindow
 from ml.models.valorant_model import ValorantGameModel
 from ml.models.valorant_vision_ai import ValorantVisionAISuggester
+from ml.models.inference_coordinator import InferenceCoordinator
+from ml.models.inference_runtime import InferenceRuntime
 from ml.utils.data_collector import GameDataCollector
 
+# State fields written to the debug log every tick
+LOGGED_STATE_KEYS = (
+    'player_health', 'player_armor', 'player_position', 'enemy_positions', 'spike_location',
+    'site_control', 'enemy_presence', 'teammate_with_smoke', 'teammate_with_flash',
+    'teammate_with_healing', 'need_coordination',
+)
+LOG_SUMMARY_EVERY = 50  # Ticks between INFO summaries (5 s at 10 Hz)
+
 def setup_logging():
     """Set up logging configuration"""
     logging.basicConfig(
@@ -17,6 +30,123 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+class FixedRateTicker:
+    """Runs a callback on a fixed-rate schedule, skipping ticks missed by slow callbacks"""
+    
+    def __init__(self, interval: float, callback, overrun_threshold: float = None):
+        self.logger = logging.getLogger('FixedRateTicker')
+        self.interval = interval
+        self.callback = callback
+        self.overrun_threshold = overrun_threshold
+        self._next_deadline = 0.0
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        
+    def start(self):
+        """Start ticking one interval from now"""
+        self._next_deadline = time.monotonic() + self.interval
+        self._schedule()
+        
+    def stop(self):
+        """Stop ticking"""
+        self._timer.stop()
+        
+    def _schedule(self):
+        delay = max(self._next_deadline - time.monotonic(), 0.0)
+        self._timer.start(int(delay * 1000))
+        
+    def _tick(self):
+        started = time.monotonic()
+        try:
+            self.callback()
+        finally:
+            now = time.monotonic()
+            if self.overrun_threshold is not None and now - started > self.overrun_threshold:
+                self.logger.debug("Tick took %.1f ms", (now - started) * 1000)
+            self._adjust_interval(now - started)
+            self._next_deadline += self.interval
+            if now > self._next_deadline:
+                # Missed one or more deadlines: drop them instead of running back-to-back catch-up ticks
+                self.logger.debug("Skipping %d missed tick(s)", int((now - self._next_deadline) / self.interval) + 1)
+                self._next_deadline = now + self.interval
+            self._schedule()
+            
+    def _adjust_interval(self, elapsed: float):
+        """Hook for subclasses to change the interval after each tick"""
+        pass
+
+class AdaptiveRateTicker(FixedRateTicker):
+    """Ticker that stretches its interval while callbacks are slow and eases back when they recover"""
+    
+    MIN_INTERVAL = 0.033  # Never tick faster than ~30 Hz
+    
+    def __init__(self, interval: float, callback, max_interval: float, overrun_threshold: float = None,
+                 smoothing: float = 0.2):
+        super().__init__(max(interval, self.MIN_INTERVAL), callback, overrun_threshold)
+        self.base_interval = self.interval
+        self.max_interval = max(max_interval, self.base_interval)
+        self.smoothing = smoothing
+        self._avg_elapsed = 0.0
+        
+    def _adjust_interval(self, elapsed: float):
+        # Exponentially weighted average of callback time; keep ~1/3 of each interval free for Qt
+        self._avg_elapsed += self.smoothing * (elapsed - self._avg_elapsed)
+        target = min(max(self.base_interval, self._avg_elapsed * 1.5), self.max_interval)
+        if target > self.interval:
+            self.interval = target  # Back off immediately
+        else:
+            self.interval = max(target, self.interval * 0.9)  # Recover gradually
+
+class VisionWorker(QThread):
+    """Captions the freshest submitted frame with the vision model, off the UI thread"""
+    caption_ready = pyqtSignal(str)
+    
+    def __init__(self, vision_ai):
+        super().__init__()
+        self.logger = logging.getLogger('VisionWorker')
+        self.vision_ai = vision_ai
+        self._frames = queue.Queue(maxsize=1)
+        self._running = True
+        self._busy = False
+        
+    def is_idle(self) -> bool:
+        """True when the worker is waiting for a frame"""
+        return not self._busy and self._frames.empty()
+        
+    def submit(self, frame):
+        """Queue a frame, replacing one the worker has not picked up yet"""
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                pass
+            self._frames.put_nowait(frame)
+            
+    def stop(self):
+        """Finish the current caption and stop the thread"""
+        self._running = False
+        self.submit(None)
+        self.wait()
+        
+    def run(self):
+        while self._running:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            self._busy = True
+            try:
+                caption = self.vision_ai.suggest(frame)
+                if caption:
+                    self.caption_ready.emit(caption)
+            except Exception as e:
+                self.logger.error(f"Vision AI error: {e}")
+            finally:
+                self._busy = False
+
 def main():
     """Main application entry point"""
     # Set up logging
@@ -25,78 +155,107 @@ def main():
     
     # Initialize components
     app = QApplication(sys.argv)
+    game_config = GAME_CONFIGS['valorant']
     game_state = GameStateDetector('valorant')
     ai_pipeline = AISuggestionPipeline()
-    ml_model = ValorantGameModel()
-    vision_ai = ValorantVisionAISuggester()
+    # Both models share one device, stream and allocator configuration
+    runtime = InferenceRuntime()
+    ml_model = ValorantGameModel(runtime=runtime)
+    vision_ai = ValorantVisionAISuggester(runtime=runtime)
+    runtime.release_cached_memory()  # Drop load-time temporaries
     data_collector = GameDataCollector('valorant')
     overlay = OverlayWindow()
     overlay.show()
+    game_state.start_capture()
+    
+    # Vision captions arrive at the model's own pace; each tick shows the latest one
+    latest_vision_caption = None
+    
+    def on_vision_caption(caption: str):
+        nonlocal latest_vision_caption
+        latest_vision_caption = caption
+        
+    vision_worker = VisionWorker(vision_ai)
+    vision_worker.caption_ready.connect(on_vision_caption)
+    vision_worker.start()
+    
+    # Rule-based suggestions run inline; the ML stage runs in the background and each
+    # tick shows the latest finished prediction
+    coordinator = InferenceCoordinator(ml_model, ai_pipeline, game='valorant', runtime=runtime)
+    stage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+    ml_future = None  # At most one ML prediction in flight
+    latest_ml_suggestions = []
+    tick_count = 0
 
     def update():
+        nonlocal tick_count, ml_future, latest_ml_suggestions
+        tick_count += 1
         try:
-            frame = game_state.capture_screen()
+            frame = game_state.get_latest_frame()
             if frame is None:
                 logger.warning("Failed to capture screen")
                 overlay.update_suggestions([])
                 return
                 
             state = game_state.process_frame(frame)
-            logger.info(f"Current game state: {state}")
-            
-            # Log the new data points
-            logger.info(f"Player health: {state.get('player_health')}")
-            logger.info(f"Player armor: {state.get('player_armor')}")
-            logger.info(f"Player position: {state.get('player_position')}")
-            logger.info(f"Enemy positions: {state.get('enemy_positions')}")
-            logger.info(f"Spike location: {state.get('spike_location')}")
-            logger.info(f"Site control: {state.get('site_control')}")
-            logger.info(f"Enemy presence: {state.get('enemy_presence')}")
-            logger.info(f"Teammate with smoke: {state.get('teammate_with_smoke')}")
-            logger.info(f"Teammate with flash: {state.get('teammate_with_flash')}")
-            logger.info(f"Teammate with healing: {state.get('teammate_with_healing')}")
-            logger.info(f"Need coordination: {state.get('need_coordination')}")
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("Current game state: %r", state)
+                logger.debug("Data points: %r", {key: state.get(key) for key in LOGGED_STATE_KEYS})
             
             data_collector.record_state(state)
-            ml_predictions = ml_model.predict(state)
-
-            # Get suggestions from AI pipeline (pass game name explicitly)
-            suggestions = ai_pipeline.get_suggestions(state, game='valorant')
-            logger.info(f"AI suggestions: {suggestions}")
-
-            # Add ML predictions if available
-            if ml_predictions and 'suggestions' in ml_predictions:
-                suggestions.extend(ml_predictions['suggestions'])
-                logger.info(f"ML suggestions: {ml_predictions['suggestions']}")
+            
+            # Frames are read-only views of buffers the capture thread reuses, so the worker
+            # gets its own copy; only copy when it is ready to start on a new frame
+            if vision_worker.is_idle():
+                vision_worker.submit(frame.copy())
+            
+            # Get AI pipeline suggestions; they are cheap, so they never wait on the ML model
+            suggestions = coordinator.rule_suggestions(state)
+            
+            # Collect an ML prediction that finished since the last tick, then start the next
+            # one; the GUI thread never waits on the model
+            if ml_future is not None and ml_future.done():
+                try:
+                    latest_ml_suggestions = ml_future.result()
+                except Exception as e:
+                    logger.error(f"ML inference error: {e}")
+                    latest_ml_suggestions = []
+                ml_future = None
+            if ml_future is None:
+                ml_future = stage_executor.submit(coordinator.ml_suggestions, state)
+            elif debug:
+                logger.debug("Previous ML prediction still running")
+            suggestions.extend(latest_ml_suggestions)
+            if debug:
+                logger.debug("AI suggestions: %r", suggestions)
 
-            # Add BLIP/vision AI suggestion
-            try:
-                vision_suggestion = vision_ai.suggest(frame)
-                if vision_suggestion:
-                    suggestions.append({
-                        'id': 'blip_vision',
-                        'text': f'Vision AI: {vision_suggestion}',
-                        'priority': 2
-                    })
-                    logger.info(f"Vision AI suggestion: {vision_suggestion}")
-            except Exception as e:
-                logger.error(f"Vision AI error: {e}")
+            # Add the most recent BLIP/vision AI suggestion
+            if latest_vision_caption:
+                suggestions.append({
+                    'id': 'blip_vision',
+                    'text': f'Vision AI: {latest_vision_caption}',
+                    'priority': 2
+                })
 
             # Update overlay with suggestions
-            if suggestions:
-                logger.info(f"Updating overlay with {len(suggestions)} suggestions")
-                overlay.update_suggestions(suggestions)
-            else:
-                logger.info("No suggestions to display")
-                overlay.update_suggestions([])
+            overlay.update_suggestions(suggestions)
+            
+            if tick_count % LOG_SUMMARY_EVERY == 0:
+                logger.info("Tick %d: health=%s armor=%s combat=%s, %d suggestions (vision: %s)",
+                            tick_count, state.get('player_health'), state.get('player_armor'),
+                            state.get('combat'), len(suggestions), latest_vision_caption)
             
         except Exception as e:
             logger.error(f"Error in update: {e}")
             overlay.update_suggestions([])
 
-    timer = QTimer()
-    timer.timeout.connect(update)
-    timer.start(100)  # Update every 100 ms
+    # No point ticking faster than suggestions are allowed to change; slow ticks stretch
+    # the interval down to min_fps
+    tick_interval = max(1.0 / game_config['max_fps'], game_config['suggestion_cooldown'])
+    ticker = AdaptiveRateTicker(tick_interval, update, max_interval=1.0 / game_config['min_fps'],
+                                overrun_threshold=1.0 / game_config['min_fps'])
+    ticker.start()
 
     try:
         sys.exit(app.exec())
@@ -107,6 +266,9 @@ def main():
                 data_collector.save_session()
             except Exception as e:
                 logger.error(f"Error saving session data: {e}")
+        vision_worker.stop()
+        stage_executor.shutdown(wait=False)
+        game_state.close()
         logger.info("Application terminated")
 
 if __name__ == "__main__":
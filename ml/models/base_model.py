@@ -1,17 +1,21 @@
 from abc import ABC, abstractmethod
-import numpy as np
 from typing import Dict, Any, List, Optional
 import torch
-import torch.nn as nn
 import logging
 
 class BaseGameModel(ABC):
     """Base class for all game-specific ML models"""
     
-    def __init__(self, model_path: Optional[str] = None):
-        """Initialize the base model"""
+    def __init__(self, model_path: Optional[str] = None, runtime=None):
+        """Initialize the base model, on the runtime's device if an InferenceRuntime is given"""
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.runtime = runtime
+        if runtime is not None:
+            self.device = runtime.device
+        else:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        torch.backends.cudnn.benchmark = True  # Input shapes are fixed, autotune once
+        torch.set_float32_matmul_precision('high')
         
         # Model should be initialized by child class before calling super().__init__
         if not hasattr(self, 'model'):
@@ -40,10 +44,10 @@ class BaseGameModel(ABC):
         try:
             # Preprocess input
             input_tensor = self.preprocess_state(state)
-            input_tensor = input_tensor.to(self.device)
+            input_tensor = input_tensor.to(self.device, non_blocking=True)
             
             # Get model prediction
-            with torch.no_grad():
+            with torch.inference_mode():
                 output = self.model(input_tensor)
                 
             # Postprocess output
@@ -71,6 +75,7 @@ class BaseGameModel(ABC):
             self.model.load_state_dict(checkpoint['model_state_dict'])
             self.model.to(self.device)
             self.model.eval()
+            self.model.requires_grad_(False)
             self.logger.info(f"Model loaded from {path}")
         except Exception as e:
             self.logger.error(f"Error loading model: {e}")
@@ -83,10 +88,10 @@ class BaseGameModel(ABC):
             correct_predictions = 0
             total_predictions = 0
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 for state, label in zip(test_data, test_labels):
                     input_tensor = self.preprocess_state(state)
-                    input_tensor = input_tensor.to(self.device)
+                    input_tensor = input_tensor.to(self.device, non_blocking=True)
                     output = self.model(input_tensor)
                     
                     # Calculate metrics based on model type
@@ -0,0 +1,43 @@
+import logging
+from typing import Dict, Any, List, Optional, Callable
+import torch
+
+class InferenceCoordinator:
+    """Runs the rule-based pipeline and the ML model for one game state"""
+
+    def __init__(self, ml_model, ai_pipeline, game: str = 'valorant', runtime=None):
+        self.logger = logging.getLogger('InferenceCoordinator')
+        self.ml_model = ml_model
+        self.ai_pipeline = ai_pipeline
+        self.game = game
+
+        # The MLP gets its own CUDA stream so it doesn't queue behind BLIP on the default one
+        self._ml_stream = None
+        if runtime is not None and runtime.is_cuda:
+            self._ml_stream = runtime.stream
+        elif runtime is None and torch.cuda.is_available():
+            self._ml_stream = torch.cuda.Stream()
+
+    def rule_suggestions(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rule-based suggestions (pass game name explicitly)"""
+        return self.ai_pipeline.get_suggestions(state, game=self.game)
+
+    def ml_suggestions(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Suggestions from the ML model, waiting for its stream to finish"""
+        with torch.inference_mode():
+            ml_predictions = self._on_stream(self._ml_stream, self.ml_model.predict, state)
+            if self._ml_stream is not None:
+                self._ml_stream.synchronize()
+
+        if ml_predictions and 'suggestions' in ml_predictions:
+            self.logger.debug("ML suggestions: %s", ml_predictions['suggestions'])
+            return ml_predictions['suggestions']
+        return []
+
+    @staticmethod
+    def _on_stream(stream: Optional['torch.cuda.Stream'], func: Callable, *args):
+        """Call func with stream as the current CUDA stream (or directly on CPU)"""
+        if stream is None:
+            return func(*args)
+        with torch.cuda.stream(stream):
+            return func(*args)
@@ -0,0 +1,44 @@
+import os
+import logging
+from typing import Optional
+import torch
+
+class InferenceRuntime:
+    """Device and allocator settings shared by the ML and vision models.
+
+    `stream` is used by the MLP only; BLIP runs on its worker thread's default stream
+    so the two never queue behind each other.
+    """
+
+    def __init__(self, device: Optional[str] = None, memory_fraction: float = 0.6,
+                 allocator_config: Optional[str] = "max_split_size_mb:128"):
+        self.logger = logging.getLogger('InferenceRuntime')
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+        self.stream = None
+        if self.device.type != 'cuda':
+            return
+
+        if allocator_config:
+            # Limits fragmentation between BLIP's large blocks and the MLP's tiny ones
+            self._configure_allocator(allocator_config)
+        # Leave room on the GPU for the game itself
+        torch.cuda.set_per_process_memory_fraction(memory_fraction, self.device)
+        self.stream = torch.cuda.Stream(self.device)
+        self.logger.info(f"Inference runtime on {torch.cuda.get_device_name(self.device)}")
+
+    @property
+    def is_cuda(self) -> bool:
+        return self.device.type == 'cuda'
+
+    def _configure_allocator(self, allocator_config: str):
+        """Apply caching allocator settings, falling back to the environment before CUDA init"""
+        try:
+            torch.cuda.memory._set_allocator_settings(allocator_config)
+        except (AttributeError, RuntimeError) as e:
+            self.logger.debug(f"Could not set allocator settings directly: {e}")
+            os.environ.setdefault('PYTORCH_CUDA_ALLOC_CONF', allocator_config)
+
+    def release_cached_memory(self):
+        """Return cached allocator blocks to the driver, e.g. after loading models"""
+        if self.is_cuda:
+            torch.cuda.empty_cache()
@@ -1,13 +1,53 @@
+import copy
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import logging
-from typing import Dict, Any, List
-import numpy as np
+import threading
+from typing import Dict, Any, List, Optional
 from .base_model import BaseGameModel
-import requests
-from PIL import Image
-import io
+
+NUM_FEATURES = 20
+
+# Feature vector layout used by _state_to_tensor
+_FLAG_FEATURES = (
+    (0, 'combat'),
+    (1, 'utility_available'),
+    (2, 'exposed'),
+    (14, 'site_control'),
+    (15, 'enemy_presence'),
+    (16, 'teammate_with_smoke'),
+    (17, 'teammate_with_flash'),
+    (18, 'teammate_with_healing'),
+    (19, 'need_coordination'),
+)
+_ONE_HOT_SLICE = slice(3, 9)
+_TEAM_MONEY_INDEX = {'low': 3, 'medium': 4, 'high': 5}
+_ROUND_TIME_INDEX = {'early': 6, 'mid': 7, 'late': 8}
+
+# Suggestion text per class of each prediction head
+ACTION_SUGGESTIONS = (
+    "Focus on aim and recoil control",
+    "Use utility to gain advantage",
+    "Reposition to better cover",
+    "Coordinate with team",
+    "Save for next round",
+)
+UTILITY_SUGGESTIONS = (
+    "Use flash to peek",
+    "Smoke off angles",
+    "Use molly to clear corners",
+    "Save utility for later",
+)
+STRATEGY_SUGGESTIONS = (
+    "Play aggressively",
+    "Play defensively",
+    "Coordinate team push",
+)
+# Head positions in the concatenated probability vector built by postprocess_output
+_ACTION_SLICE = slice(0, 5)
+_UTILITY_SLICE = slice(5, 9)
+_STRATEGY_SLICE = slice(9, 12)
 
 class ValorantModel(nn.Module):
     """Neural network model for Valorant game state analysis"""
@@ -51,60 +91,161 @@ class ValorantModel(nn.Module):
             'hidden_size': self.hidden_size
         }
 
+class _CudaGraphForward:
+    """Replays a CUDA graph captured from a fixed-shape forward pass"""
+    
+    def __init__(self, forward, static_input: torch.Tensor, warmup_iterations: int = 3):
+        # The graph reads its input from static_input's memory on every replay
+        self._static_input = static_input
+        with torch.inference_mode():
+            # Warm up on a side stream before capture, as torch.cuda.graph requires
+            stream = torch.cuda.Stream(static_input.device)
+            stream.wait_stream(torch.cuda.current_stream(static_input.device))
+            with torch.cuda.stream(stream):
+                for _ in range(warmup_iterations):
+                    forward(static_input)
+            torch.cuda.current_stream(static_input.device).wait_stream(stream)
+            
+            self._graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self._graph):
+                self._static_output = forward(static_input)
+                
+    def __call__(self, x: torch.Tensor) -> Dict[str, torch.Tensor]:
+        if x is not self._static_input:
+            self._static_input.copy_(x)
+        self._graph.replay()
+        # Outputs live in graph-owned memory that the next replay overwrites
+        return {name: value.clone() for name, value in self._static_output.items()}
+
 class ValorantGameModel(BaseGameModel):
     """Valorant-specific game model implementation with vision AI integration"""
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, runtime=None):
         self.logger = logging.getLogger('ValorantGameModel')
         self.model = self._create_model()
-        super().__init__(model_path)
+        super().__init__(model_path, runtime)
+        if self.device.type == 'cpu':
+            # Leave cores for the Qt thread and the game itself
+            torch.set_num_threads(2)
         self.model.to(self.device)  # Move model to appropriate device
         self.model.eval()  # Set to evaluation mode
+        self.model.requires_grad_(False)  # Forward-only outside of train()
+        self._allocate_feature_buffer()
+        self._build_inference_model()
         
     def _create_model(self) -> nn.Module:
         """Create the ValorantModel with correct input size and heads"""
-        return ValorantModel(input_size=20)
+        return ValorantModel(input_size=NUM_FEATURES)
+        
+    def _build_inference_model(self):
+        """Compile self.model into self._forward for predict().
 
-    def predict(self, state: Dict[str, Any], frame: np.ndarray = None) -> Dict[str, Any]:
-        """Make predictions based on game state and optionally a frame using a free vision AI API"""
+        Tries torch.compile, then TorchScript with optimize_for_inference (captured as a CUDA
+        graph on the GPU), then plain eager mode. self.model stays an ordinary module, so
+        training and checkpoints are unaffected.
+        """
+        self.model.eval()
+        module = self._inference_module()
+        if hasattr(torch, 'compile'):
+            mode = "reduce-overhead" if self.device.type == 'cuda' else "default"
+            try:
+                compiled = torch.compile(module, mode=mode, dynamic=False)
+                self._warmup(compiled)
+                self._forward = compiled
+                self.logger.info(f"Compiled ValorantModel with torch.compile ({mode})")
+                return
+            except Exception as e:
+                self.logger.warning(f"torch.compile failed for ValorantModel: {e}")
+        try:
+            # Freezing snapshots the weights, so this is rebuilt after load_model() and train()
+            forward = torch.jit.optimize_for_inference(torch.jit.script(module))
+            self._warmup(forward)
+            self.logger.info("Compiled ValorantModel with TorchScript")
+        except Exception as e:
+            self.logger.warning(f"TorchScript failed for ValorantModel, running eagerly: {e}")
+            forward = module
+            
+        if self.device.type == 'cuda':
+            # torch.compile's reduce-overhead mode already uses CUDA graphs; capture one by hand here
+            try:
+                forward = _CudaGraphForward(forward, self._feat_t)
+                self.logger.info("Captured ValorantModel forward as a CUDA graph")
+            except Exception as e:
+                self.logger.warning(f"CUDA graph capture failed for ValorantModel: {e}")
+        self._forward = forward
+            
+    def _inference_module(self) -> nn.Module:
+        """Copy of self.model for inference: Dropout removed, and int8 dynamically quantized on CPU"""
+        module = copy.deepcopy(self.model).eval()
+        # Dropout is the identity in eval mode; dropping it saves a module call per layer
+        module.feature_extractor = nn.Sequential(*(
+            nn.ReLU(inplace=True) if isinstance(layer, nn.ReLU) else layer
+            for layer in module.feature_extractor if not isinstance(layer, nn.Dropout)
+        ))
+        if self.device.type != 'cpu':
+            return module
+        try:
+            return torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            self.logger.warning(f"Dynamic quantization failed, using fp32 weights: {e}")
+            return module
+            
+    def _warmup(self, forward, iterations: int = 3):
+        """Run a few dummy forwards so compilation happens before the first real tick"""
+        with torch.inference_mode():
+            dummy = torch.zeros(NUM_FEATURES, dtype=torch.float32, device=self.device)
+            for _ in range(iterations):
+                forward(dummy)
+                
+    def load_model(self, path: str):
+        """Load model from file and rebuild the inference model from the new weights"""
+        super().load_model(path)
+        if hasattr(self, '_forward'):
+            self._build_inference_model()
+        
+    def _allocate_feature_buffer(self):
+        """Preallocate the feature vector filled in place by _state_to_tensor"""
+        host = torch.zeros(NUM_FEATURES, dtype=torch.float32)
+        if self.device.type == 'cuda':
+            # Pinned host memory lets the per-tick upload run asynchronously
+            host = host.pin_memory()
+            self._feat_t = torch.zeros(NUM_FEATURES, dtype=torch.float32, device=self.device)
+            self._copy_stream = torch.cuda.Stream(self.device)
+            # Recorded after each upload; the host buffer is only rewritten once it has fired
+            self._copy_done = torch.cuda.Event()
+        else:
+            self._feat_t = host
+            self._copy_stream = None
+            self._copy_done = None
+        self._feat_host = host
+        self._feat = host.numpy()  # Shares memory with the host tensor
+        # Predictions can overlap when a tick times out, and they share the buffer
+        self._feat_lock = threading.Lock()
+
+    def predict(self, state: Dict[str, Any], remote_caption: Optional[str] = None) -> Dict[str, Any]:
+        """Make predictions based on game state, optionally merging a caption produced elsewhere"""
         suggestions = []
         confidence = 0.8
         try:
-            state_tensor = self._state_to_tensor(state).to(self.device)
-            with torch.no_grad():
-                output = self.model(state_tensor)
-            # Use postprocess_output to generate suggestions from model output
-            result = self.postprocess_output(output, state)
+            with self._feat_lock, torch.inference_mode():
+                state_tensor = self._state_to_tensor(state)
+                output = self._forward(state_tensor)
+                # Use postprocess_output to generate suggestions from model output
+                result = self.postprocess_output(output, state)
             suggestions = result.get('suggestions', [])
         except Exception as e:
             self.logger.error(f"Error making predictions: {e}")
             suggestions = []
             confidence = 0.0
 
-        # If a frame is provided, use a free vision AI API (e.g., Hugging Face Inference API)
-        if frame is not None:
-            try:
-                img = Image.fromarray(frame)
-                buf = io.BytesIO()
-                img.save(buf, format='JPEG')
-                buf.seek(0)
-                response = requests.post(
-                    'https://api-inference.huggingface.co/models/Salesforce/blip-image-captioning-base',
-                    headers={'Authorization': 'demo1'},
-                    data=buf.getvalue()
-                )
-                if response.status_code == 200:
-                    result = response.json()
-                    caption = result[0]['generated_text'] if isinstance(result, list) and 'generated_text' in result[0] else None
-                    if caption:
-                        suggestions.append({
-                            'id': 'vision_ai',
-                            'text': f'Vision AI: {caption}',
-                            'priority': 1
-                        })
-                        confidence = 1.0
-            except Exception as e:
-                self.logger.error(f"Vision AI API error: {e}")
+        # Captions are produced off the tick (e.g. by the vision worker) and only merged here
+        if remote_caption:
+            suggestions.append({
+                'id': 'vision_ai',
+                'text': f'Vision AI: {remote_caption}',
+                'priority': 1
+            })
+            confidence = 1.0
 
         return {
             'suggestions': suggestions,
@@ -112,30 +253,45 @@ class ValorantGameModel(BaseGameModel):
         }
         
     def _state_to_tensor(self, state: Dict[str, Any]) -> torch.Tensor:
-        """Convert game state to tensor format with more features"""
-        features = [
-            1.0 if state.get('combat', False) else 0.0,
-            1.0 if state.get('utility_available', False) else 0.0,
-            1.0 if state.get('exposed', False) else 0.0,
-            1.0 if state.get('team_money', '') == 'low' else 0.0,
-            1.0 if state.get('team_money', '') == 'medium' else 0.0,
-            1.0 if state.get('team_money', '') == 'high' else 0.0,
-            1.0 if state.get('round_time', '') == 'early' else 0.0,
-            1.0 if state.get('round_time', '') == 'mid' else 0.0,
-            1.0 if state.get('round_time', '') == 'late' else 0.0,
-            float(state.get('player_health', 100)) / 100.0,
-            float(state.get('player_armor', 0)) / 100.0,
-            float(state.get('player_position', [0.0, 0.0])[0]),
-            float(state.get('player_position', [0.0, 0.0])[1]),
-            float(len(state.get('enemy_positions', []))),
-            1.0 if state.get('site_control', False) else 0.0,
-            1.0 if state.get('enemy_presence', False) else 0.0,
-            1.0 if state.get('teammate_with_smoke', False) else 0.0,
-            1.0 if state.get('teammate_with_flash', False) else 0.0,
-            1.0 if state.get('teammate_with_healing', False) else 0.0,
-            1.0 if state.get('need_coordination', False) else 0.0
-        ]
-        return torch.tensor(features, dtype=torch.float32)
+        """Convert game state to tensor format with more features.
+
+        Fills and returns a preallocated buffer on the model device; it is
+        overwritten by the next call.
+        """
+        if self._copy_done is not None:
+            # The previous non_blocking upload may still be reading the pinned buffer
+            self._copy_done.synchronize()
+        feat = self._feat
+        get = state.get
+        for i, key in _FLAG_FEATURES:
+            feat[i] = 1.0 if get(key, False) else 0.0
+            
+        # One-hot team money and round time
+        feat[_ONE_HOT_SLICE] = 0.0
+        i = _TEAM_MONEY_INDEX.get(get('team_money', ''))
+        if i is not None:
+            feat[i] = 1.0
+        i = _ROUND_TIME_INDEX.get(get('round_time', ''))
+        if i is not None:
+            feat[i] = 1.0
+            
+        feat[9] = float(get('player_health', 100)) / 100.0
+        feat[10] = float(get('player_armor', 0)) / 100.0
+        position = get('player_position', [0.0, 0.0])
+        feat[11] = float(position[0])
+        feat[12] = float(position[1])
+        feat[13] = float(len(get('enemy_positions', [])))
+        
+        if self._copy_stream is not None:
+            # Upload on the copy stream; the compute stream waits for it right before the forward
+            compute_stream = torch.cuda.current_stream(self.device)
+            # Don't overwrite the device buffer while an earlier forward may still read it
+            self._copy_stream.wait_stream(compute_stream)
+            with torch.cuda.stream(self._copy_stream):
+                self._feat_t.copy_(self._feat_host, non_blocking=True)
+                self._copy_done.record(self._copy_stream)
+            compute_stream.wait_stream(self._copy_stream)
+        return self._feat_t
         
     def _predictions_to_suggestions(self, predictions: torch.Tensor) -> List[Dict[str, Any]]:
         """Convert model predictions to suggestion format, fallback if no confident suggestion"""
@@ -168,62 +324,32 @@ class ValorantGameModel(BaseGameModel):
         
     def preprocess_state(self, state: Dict[str, Any]) -> torch.Tensor:
         """Convert game state to model input tensor"""
-        # Extract relevant features from game state
-        features = []
-        
-        # Combat state
-        features.append(1.0 if state.get('combat', False) else 0.0)
-        
-        # Utility availability
-        features.append(1.0 if state.get('utility_available', False) else 0.0)
-        
-        # Round time (one-hot encoded)
-        round_time = state.get('round_time', 'mid')
-        round_time_encoding = {
-            'early': [1, 0, 0],
-            'mid': [0, 1, 0],
-            'late': [0, 0, 1]
-        }
-        features.extend(round_time_encoding.get(round_time, [0, 0, 0]))
-        
-        # Team money state (one-hot encoded)
-        money_state = state.get('team_money', 'medium')
-        money_encoding = {
-            'low': [1, 0, 0],
-            'medium': [0, 1, 0],
-            'high': [0, 0, 1]
-        }
-        features.extend(money_encoding.get(money_state, [0, 0, 0]))
-        
-        # Exposure state
-        features.append(1.0 if state.get('exposed', False) else 0.0)
-        
-        # Convert to tensor
-        return torch.FloatTensor(features)
+        # Same features the model is fed at prediction time, copied out of the shared buffer
+        with self._feat_lock:
+            return self._state_to_tensor(state).clone()
         
     def postprocess_output(self, output: Dict[str, torch.Tensor], state: Dict[str, Any]) -> Dict[str, Any]:
         """Convert model output to game suggestions"""
         suggestions = []
         
+        # One softmax per head, concatenated so the probabilities reach the host in a single transfer
+        probs = torch.cat([F.softmax(output['action'], dim=-1),
+                           F.softmax(output['utility'], dim=-1),
+                           F.softmax(output['strategy'], dim=-1)], dim=-1).float().cpu().numpy()
+        action_probs = probs[_ACTION_SLICE]
+        utility_probs = probs[_UTILITY_SLICE]
+        strategy_probs = probs[_STRATEGY_SLICE]
+        
         # Process action predictions
-        action_probs = F.softmax(output['action'], dim=-1)
-        best_action = torch.argmax(action_probs).item()
-        action_suggestions = [
-            "Focus on aim and recoil control",
-            "Use utility to gain advantage",
-            "Reposition to better cover",
-            "Coordinate with team",
-            "Save for next round"
-        ]
+        best_action = int(action_probs.argmax())
         if action_probs[best_action] > 0.5:  # Only suggest if confident
             suggestions.append({
                 'title': 'Recommended Action',
-                'message': action_suggestions[best_action],
-                'priority': 1 if best_action in [0, 2] else 2
+                'message': ACTION_SUGGESTIONS[best_action],
+                'priority': 1 if best_action in (0, 2) else 2
             })
             
         # Process position suggestions
-        position = output['position'].cpu().numpy()
         if state.get('exposed', False):
             suggestions.append({
                 'title': 'Position Warning',
@@ -232,33 +358,20 @@ class ValorantGameModel(BaseGameModel):
             })
             
         # Process utility suggestions
-        utility_probs = F.softmax(output['utility'], dim=-1)
-        best_utility = torch.argmax(utility_probs).item()
-        utility_suggestions = [
-            "Use flash to peek",
-            "Smoke off angles",
-            "Use molly to clear corners",
-            "Save utility for later"
-        ]
+        best_utility = int(utility_probs.argmax())
         if utility_probs[best_utility] > 0.4 and state.get('utility_available', False):
             suggestions.append({
                 'title': 'Utility Suggestion',
-                'message': utility_suggestions[best_utility],
+                'message': UTILITY_SUGGESTIONS[best_utility],
                 'priority': 2
             })
             
         # Process strategy suggestions
-        strategy_probs = F.softmax(output['strategy'], dim=-1)
-        best_strategy = torch.argmax(strategy_probs).item()
-        strategy_suggestions = [
-            "Play aggressively",
-            "Play defensively",
-            "Coordinate team push"
-        ]
+        best_strategy = int(strategy_probs.argmax())
         if strategy_probs[best_strategy] > 0.5:
             suggestions.append({
                 'title': 'Strategy Suggestion',
-                'message': strategy_suggestions[best_strategy],
+                'message': STRATEGY_SUGGESTIONS[best_strategy],
                 'priority': 2
             })
             
@@ -267,6 +380,7 @@ class ValorantGameModel(BaseGameModel):
     def train(self, training_data: List[Dict[str, Any]], labels: List[Dict[str, Any]]):
         """Train the model on game data"""
         self.model.train()
+        self.model.requires_grad_(True)
         optimizer = torch.optim.Adam(self.model.parameters())
         
         for epoch in range(100):  # 100 epochs
@@ -293,6 +407,11 @@ class ValorantGameModel(BaseGameModel):
             if (epoch + 1) % 10 == 0:
                 self.logger.info(f"Epoch {epoch + 1}, Loss: {total_loss / len(training_data):.4f}")
                 
+        # Back to forward-only inference
+        self.model.eval()
+        self.model.requires_grad_(False)
+        self._build_inference_model()
+                
     def calculate_loss(self, output: Dict[str, torch.Tensor], target: Dict[str, Any]) -> torch.Tensor:
         """Calculate loss between model output and target"""
         loss = 0
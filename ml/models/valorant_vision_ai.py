@@ -1,21 +1,141 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
 import torch
-from PIL import Image
+import torch.nn.functional as F
 from transformers import BlipProcessor, BlipForConditionalGeneration
 import numpy as np
 import cv2
 
+PROMPT = "What should I do next in Valorant?"
+MAX_NEW_TOKENS = 12  # Captions are short overlay lines; generate time grows with every token
+
+# Caption cache defaults; frames whose dHash is within max_distance bits reuse a caption
+DEFAULT_CACHE_OPTIONS = {
+    'enabled': True,
+    'max_size': 256,
+    'max_age_s': 30.0,
+    'max_distance': 4,
+}
+
 class ValorantVisionAISuggester:
-    def __init__(self, device=None):
+    def __init__(self, device=None, compile_model: bool = True, cache_options: Optional[dict] = None,
+                 runtime=None):
+        self.logger = logging.getLogger('ValorantVisionAISuggester')
+        self.cache_options = {**DEFAULT_CACHE_OPTIONS, **(cache_options or {})}
+        self._cache = OrderedDict()  # dHash -> (caption, time cached), least recently used first
+        if runtime is not None:
+            device = runtime.device
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        # Half precision runs the matmuls on Tensor Cores; CPUs stay in fp32
+        self.dtype = torch.float16 if str(self.device).startswith("cuda") else torch.float32
+        torch.set_float32_matmul_precision('high')
+        torch.backends.cudnn.benchmark = True
         self.processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-        self.model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base").to(self.device)
+        self.model = BlipForConditionalGeneration.from_pretrained(
+            "Salesforce/blip-image-captioning-base", torch_dtype=self.dtype).to(self.device)
+        self.model.eval()
+        
+        # Image preprocessing constants taken from the processor, kept on the model device
+        image_processor = self.processor.image_processor
+        self._image_size = (image_processor.size['height'], image_processor.size['width'])
+        self._pixel_mean = torch.tensor(image_processor.image_mean, dtype=torch.float32,
+                                        device=self.device).view(1, 3, 1, 1)
+        self._pixel_std = torch.tensor(image_processor.image_std, dtype=torch.float32,
+                                       device=self.device).view(1, 3, 1, 1)
+        # The prompt never changes, so it is tokenized once
+        self._prompt_inputs = self.processor(text=PROMPT, return_tensors="pt").to(self.device)
+        if self.model.generation_config.pad_token_id is None:
+            # Without a pad token generate() warns and derives one on every call
+            self.model.generation_config.pad_token_id = self.processor.tokenizer.eos_token_id
+        if compile_model:
+            self._compile_model()
+
+    def _compile_model(self):
+        """Compile the BLIP vision encoder and warm it up so codegen happens before the first real frame"""
+        if not hasattr(torch, 'compile'):
+            return
+        vision_model = self.model.vision_model
+        # CUDA graphs only pay off on the GPU; the default mode still fuses kernels on CPU
+        mode = "reduce-overhead" if str(self.device).startswith("cuda") else "default"
+        try:
+            self.model.vision_model = torch.compile(vision_model, mode=mode, fullgraph=False)
+            self._generate(np.zeros((224, 224, 3), dtype=np.uint8))
+            self.logger.info(f"Compiled BLIP vision encoder ({mode})")
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed, running BLIP eagerly: {e}")
+            self.model.vision_model = vision_model
 
     def suggest(self, frame: np.ndarray) -> str:
-        """Generate a suggestion for Valorant based on a screen capture (BGR numpy array)"""
-        # Convert BGR (OpenCV) to RGB (PIL)
-        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        prompt = "What should I do next in Valorant?"
-        inputs = self.processor(image, prompt, return_tensors="pt").to(self.device)
-        out = self.model.generate(**inputs, max_new_tokens=30)
+        """Generate a suggestion for Valorant based on a screen capture (BGRA or BGR numpy array)"""
+        if not self.cache_options['enabled']:
+            return self._generate(frame)
+            
+        frame_hash = self._dhash(frame)
+        suggestion = self._cached_caption(frame_hash)
+        if suggestion is None:
+            suggestion = self._generate(frame)
+            self._cache[frame_hash] = (suggestion, time.monotonic())
+            self._cache.move_to_end(frame_hash)
+            while len(self._cache) > self.cache_options['max_size']:
+                self._cache.popitem(last=False)
+        return suggestion
+
+    def clear_cache(self):
+        """Forget all cached captions"""
+        self._cache.clear()
+
+    @staticmethod
+    def _dhash(frame: np.ndarray) -> int:
+        """64-bit difference hash: sign of horizontal gradients on a 9x8 grayscale thumbnail"""
+        small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+        code = cv2.COLOR_BGRA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = cv2.cvtColor(small, code)
+        return int.from_bytes(np.packbits(gray[:, 1:] > gray[:, :-1]).tobytes(), 'big')
+
+    def _cached_caption(self, frame_hash: int) -> Optional[str]:
+        """Return a fresh caption for a hash within max_distance bits, most recent entries first"""
+        now = time.monotonic()
+        max_age = self.cache_options['max_age_s']
+        max_distance = self.cache_options['max_distance']
+        expired = []
+        hit = None
+        for cached_hash, (caption, cached_at) in reversed(self._cache.items()):
+            if now - cached_at > max_age:
+                expired.append(cached_hash)
+            elif bin(cached_hash ^ frame_hash).count('1') <= max_distance:
+                hit = cached_hash
+                break
+        for cached_hash in expired:
+            del self._cache[cached_hash]
+        if hit is None:
+            return None
+        self._cache.move_to_end(hit)
+        return self._cache[hit][0]
+
+    def _pixel_values(self, frame: np.ndarray) -> torch.Tensor:
+        """Resize and normalize a BGR(A) frame into BLIP pixel_values on the model device"""
+        height, width = self._image_size
+        if str(self.device).startswith("cuda"):
+            # Upload the raw frame once; channel reorder, resize and normalize happen on the GPU
+            frame_t = torch.from_numpy(np.ascontiguousarray(frame)).to(self.device)
+            image = frame_t[..., [2, 1, 0]].permute(2, 0, 1).unsqueeze(0).float()
+            image = F.interpolate(image, size=(height, width), mode='bilinear',
+                                  align_corners=False, antialias=True)
+        else:
+            # On CPU shrink the frame first so only 384x384 pixels are converted to float
+            small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            image = torch.from_numpy(np.ascontiguousarray(small[..., 2::-1])).permute(2, 0, 1).unsqueeze(0).float()
+        image = image.div_(255.0).sub_(self._pixel_mean).div_(self._pixel_std)
+        return image.to(self.dtype).contiguous()
+
+    def _generate(self, frame: np.ndarray) -> str:
+        """Run BLIP captioning on a frame"""
+        pixel_values = self._pixel_values(frame)
+        out = self.model.generate(pixel_values=pixel_values, input_ids=self._prompt_inputs['input_ids'],
+                                  attention_mask=self._prompt_inputs['attention_mask'],
+                                  max_new_tokens=MAX_NEW_TOKENS, num_beams=1, do_sample=False,
+                                  use_cache=True, no_repeat_ngram_size=2)
         suggestion = self.processor.decode(out[0], skip_special_tokens=True)
         return suggestion
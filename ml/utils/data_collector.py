@@ -1,9 +1,308 @@
 import json
 import os
+import time
 from typing import Dict, Any, List, Optional
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import numpy as np
+from .schema import Action, Gun, RoundTime, Strategy, TeamMoney, Utility, code_table
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, the stdlib json module is used without it
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional dependency, sessions are loaded whole with json without it
+    ijson = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Optional dependency, features are encoded in pure Python without it
+    NUMBA_AVAILABLE = False
+
+def _dump_json(payload: Dict[str, Any], path: str):
+    """Write payload as indented JSON, with orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(payload, f, indent=2)
+
+def _load_json(path: str) -> Any:
+    """Read a JSON file, with orjson when available"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Layout of the feature vectors built by _states_to_feature_matrix
+NUM_STATE_FEATURES = 13
+ROUND_TIME_OFFSET = 5
+TEAM_MONEY_OFFSET = 8
+# Categorical fields may hold either the schema enum member or its name
+ROUND_TIME_IDX = code_table(RoundTime)
+TEAM_MONEY_IDX = code_table(TeamMoney)
+
+# Class indices used by _label_to_target; unknown values map to 0
+_ACTION_IDX = code_table(Action)
+_UTILITY_IDX = code_table(Utility)
+_STRATEGY_IDX = code_table(Strategy)
+
+# Columnar session files: every state and action field has a typed column, see _SessionColumns
+MAX_ENEMIES = 5
+_ABILITY_KEYS = ('Q', 'E', 'C', 'X')
+_ROUND_TIME_NAMES = tuple(member.name for member in RoundTime)
+_TEAM_MONEY_NAMES = tuple(member.name for member in TeamMoney)
+_GUN_NAMES = tuple(member.name for member in Gun)
+_ACTION_NAMES = tuple(member.name for member in Action)
+_UTILITY_NAMES = tuple(member.name for member in Utility)
+_STRATEGY_NAMES = tuple(member.name for member in Strategy)
+
+def _is_flag(value: Any) -> bool:
+    return isinstance(value, (bool, np.bool_))
+
+def _is_small_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and -32768 <= value <= 32767
+
+def _is_point(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(v, float) for v in value)
+
+def _is_points(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) <= MAX_ENEMIES and all(map(_is_point, value))
+
+def _is_abilities(value: Any) -> bool:
+    return isinstance(value, dict) and value.keys() == set(_ABILITY_KEYS) and all(map(_is_flag, value.values()))
+
+def _is_name_in(names: tuple):
+    return lambda value: isinstance(value, str) and value in names
+
+# What a field must hold to be stored in its column without changing on load; anything else
+# (None, unknown names, integer coordinates, extra keys) sends the session to JSON instead
+_SESSION_STATE_SCHEMA = {
+    'combat': _is_flag,
+    'utility_available': _is_flag,
+    'round_time': _is_name_in(_ROUND_TIME_NAMES),
+    'team_money': _is_name_in(_TEAM_MONEY_NAMES),
+    'exposed': _is_flag,
+    'player_health': _is_small_int,
+    'player_armor': _is_small_int,
+    'player_position': _is_point,
+    'enemy_positions': _is_points,
+    'spike_location': _is_point,
+    'site_control': _is_flag,
+    'enemy_presence': _is_flag,
+    'teammate_with_smoke': _is_flag,
+    'teammate_with_flash': _is_flag,
+    'teammate_with_healing': _is_flag,
+    'need_coordination': _is_flag,
+    'abilities': _is_abilities,
+    'equipped_gun': _is_name_in(_GUN_NAMES),
+}
+_ACTION_SCHEMA = {
+    'action': _is_name_in(_ACTION_NAMES),
+    'position': _is_point,
+    'utility': _is_name_in(_UTILITY_NAMES),
+    'strategy': _is_name_in(_STRATEGY_NAMES),
+    'success': _is_flag,
+}
+
+def _schema_misfit(schema: Dict[str, Any], record: Dict[str, Any]) -> Optional[str]:
+    """First key of record that is missing, unknown or doesn't fit its column; None if it all fits"""
+    for key, fits in schema.items():
+        if key not in record or not fits(record[key]):
+            return key
+    if len(record) != len(schema):
+        return next(key for key in record if key not in schema)
+    return None
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def encode_batch(combat, util, exposed, hp, armor, round_code, money_code, site, enemy, out):
+        """Fill out (N, 13) from parallel per-state columns; category codes of -1 mean unknown"""
+        for i in range(out.shape[0]):
+            out[i, 0] = combat[i]
+            out[i, 1] = util[i]
+            out[i, 2] = exposed[i]
+            out[i, 3] = hp[i] / 100.0
+            out[i, 4] = armor[i] / 100.0
+            if round_code[i] >= 0:
+                out[i, ROUND_TIME_OFFSET + round_code[i]] = 1.0
+            if money_code[i] >= 0:
+                out[i, TEAM_MONEY_OFFSET + money_code[i]] = 1.0
+            out[i, 11] = site[i]
+            out[i, 12] = enemy[i]
+else:
+    encode_batch = None
+
+class _StateColumns:
+    """Growable typed per-feature columns of game states (structure of arrays)"""
+
+    _FIELDS = ('combat', 'util', 'exposed', 'site', 'enemy', 'hp', 'armor', 'round_code', 'money_code')
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(capacity, 1)
+        self.n = 0
+        self.combat = np.empty(capacity, dtype=np.int8)
+        self.util = np.empty(capacity, dtype=np.int8)
+        self.exposed = np.empty(capacity, dtype=np.int8)
+        self.site = np.empty(capacity, dtype=np.int8)
+        self.enemy = np.empty(capacity, dtype=np.int8)
+        self.hp = np.empty(capacity, dtype=np.float32)
+        self.armor = np.empty(capacity, dtype=np.float32)
+        self.round_code = np.empty(capacity, dtype=np.int8)
+        self.money_code = np.empty(capacity, dtype=np.int8)
+
+    @classmethod
+    def from_states(cls, states: List[Dict[str, Any]]) -> '_StateColumns':
+        columns = cls(len(states))
+        for state in states:
+            columns.append(state)
+        return columns
+
+    def append(self, state: Dict[str, Any]):
+        """Write one state's features into the next row, doubling capacity when full"""
+        i = self.n
+        if i == len(self.combat):
+            self._grow(2 * i)
+        self._write(i, state)
+        self.n = i + 1
+
+    def _write(self, i: int, state: Dict[str, Any]):
+        get = state.get
+        self.combat[i] = bool(get('combat', False))
+        self.util[i] = bool(get('utility_available', False))
+        self.exposed[i] = bool(get('exposed', False))
+        self.site[i] = bool(get('site_control', False))
+        self.enemy[i] = bool(get('enemy_presence', False))
+        self.hp[i] = get('player_health', 100)
+        self.armor[i] = get('player_armor', 0)
+        self.round_code[i] = ROUND_TIME_IDX.get(get('round_time', 'mid'), -1)
+        self.money_code[i] = TEAM_MONEY_IDX.get(get('team_money', 'medium'), -1)
+
+    def _grow(self, capacity: int):
+        for field in self._FIELDS:
+            column = getattr(self, field)
+            setattr(self, field, np.resize(column, (capacity,) + column.shape[1:]))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The recorded rows of every column, by field name"""
+        return {field: getattr(self, field)[:self.n] for field in self._FIELDS}
+
+    def encode(self, out: np.ndarray):
+        """Fill a zeroed (n, 13) float32 matrix from the recorded columns"""
+        n = self.n
+        if encode_batch is not None:
+            encode_batch(self.combat[:n], self.util[:n], self.exposed[:n], self.hp[:n], self.armor[:n],
+                         self.round_code[:n], self.money_code[:n], self.site[:n], self.enemy[:n], out)
+            return
+            
+        out[:, 0] = self.combat[:n]
+        out[:, 1] = self.util[:n]
+        out[:, 2] = self.exposed[:n]
+        out[:, 3] = self.hp[:n] / 100.0
+        out[:, 4] = self.armor[:n] / 100.0
+        for codes, offset in ((self.round_code[:n], ROUND_TIME_OFFSET), (self.money_code[:n], TEAM_MONEY_OFFSET)):
+            rows = np.flatnonzero(codes >= 0)
+            out[rows, offset + codes[rows]] = 1.0
+        out[:, 11] = self.site[:n]
+        out[:, 12] = self.enemy[:n]
+
+class _SessionColumns(_StateColumns):
+    """State columns of a recording session, one per field of _SESSION_STATE_SCHEMA
+
+    Rows must fit the schema (see _schema_misfit); states() then returns them unchanged.
+    """
+
+    _FIELDS = _StateColumns._FIELDS + ('player_position', 'spike_location', 'enemy_positions', 'enemy_count', 'smoke', 'flash',
+                                       'healing', 'coordination', 'abilities', 'gun_code')
+
+    def __init__(self, capacity: int = 1024):
+        super().__init__(capacity)
+        capacity = len(self.combat)
+        # Health and armor are whole numbers in recorded states; float columns would hand back floats
+        self.hp = np.empty(capacity, dtype=np.int16)
+        self.armor = np.empty(capacity, dtype=np.int16)
+        self.player_position = np.empty((capacity, 2), dtype=np.float64)
+        self.spike_location = np.empty((capacity, 2), dtype=np.float64)
+        self.enemy_positions = np.empty((capacity, MAX_ENEMIES, 2), dtype=np.float64)
+        self.enemy_count = np.empty(capacity, dtype=np.int8)
+        self.smoke = np.empty(capacity, dtype=np.int8)
+        self.flash = np.empty(capacity, dtype=np.int8)
+        self.healing = np.empty(capacity, dtype=np.int8)
+        self.coordination = np.empty(capacity, dtype=np.int8)
+        self.abilities = np.empty((capacity, len(_ABILITY_KEYS)), dtype=np.int8)
+        self.gun_code = np.empty(capacity, dtype=np.int8)
+
+    def _write(self, i: int, state: Dict[str, Any]):
+        super()._write(i, state)
+        self.player_position[i] = state['player_position']
+        self.spike_location[i] = state['spike_location']
+        enemies = state['enemy_positions']
+        count = len(enemies)
+        if count:
+            self.enemy_positions[i, :count] = enemies
+        self.enemy_positions[i, count:] = 0.0
+        self.enemy_count[i] = count
+        self.smoke[i] = state['teammate_with_smoke']
+        self.flash[i] = state['teammate_with_flash']
+        self.healing[i] = state['teammate_with_healing']
+        self.coordination[i] = state['need_coordination']
+        abilities = state['abilities']
+        self.abilities[i] = [abilities[key] for key in _ABILITY_KEYS]
+        self.gun_code[i] = Gun[state['equipped_gun']]
+
+    def states(self) -> List[Dict[str, Any]]:
+        return self.to_states(self.arrays())
+
+    @staticmethod
+    def to_states(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Turn session columns (recorded or loaded from .npz) back into state dicts"""
+        flags = {field: columns[field].astype(bool).tolist()
+                 for field in ('combat', 'util', 'exposed', 'site', 'enemy', 'smoke', 'flash', 'healing',
+                               'coordination')}
+        hp = columns['hp'].tolist()
+        armor = columns['armor'].tolist()
+        round_code = columns['round_code'].tolist()
+        money_code = columns['money_code'].tolist()
+        position = columns['player_position'].tolist()
+        spike = columns['spike_location'].tolist()
+        enemy_positions = columns['enemy_positions'].tolist()
+        enemy_count = columns['enemy_count'].tolist()
+        abilities = columns['abilities'].astype(bool).tolist()
+        gun_code = columns['gun_code'].tolist()
+        states = []
+        for i in range(len(hp)):
+            states.append({
+                'combat': flags['combat'][i],
+                'utility_available': flags['util'][i],
+                'round_time': _ROUND_TIME_NAMES[round_code[i]],
+                'team_money': _TEAM_MONEY_NAMES[money_code[i]],
+                'exposed': flags['exposed'][i],
+                'player_health': hp[i],
+                'player_armor': armor[i],
+                'player_position': position[i],
+                'enemy_positions': enemy_positions[i][:enemy_count[i]],
+                'spike_location': spike[i],
+                'site_control': flags['site'][i],
+                'enemy_presence': flags['enemy'][i],
+                'teammate_with_smoke': flags['smoke'][i],
+                'teammate_with_flash': flags['flash'][i],
+                'teammate_with_healing': flags['healing'][i],
+                'need_coordination': flags['coordination'][i],
+                'abilities': dict(zip(_ABILITY_KEYS, abilities[i])),
+                'equipped_gun': _GUN_NAMES[gun_code[i]],
+            })
+        return states
+
+# Per-record arrays of a columnar session file
+_SESSION_NPZ_KEYS = _SessionColumns._FIELDS + (
+    'has_action', 'action_success', 'action_code', 'utility_code', 'strategy_code', 'position')
 
 class GameDataCollector:
     """Utility for collecting and processing game data for ML training"""
@@ -12,8 +311,7 @@ class GameDataCollector:
         self.game_name = game_name
         self.data_dir = data_dir
         self.logger = logging.getLogger('GameDataCollector')
-        self.current_session = []
-        self.session_start = datetime.now()
+        self._reset_session()
         self.setup_directories()
         
     def setup_directories(self):
@@ -27,70 +325,245 @@ class GameDataCollector:
     def record_state(self, state: Dict[str, Any], action: Optional[Dict[str, Any]] = None):
         """Record a game state and optional action"""
         try:
-            record = {
-                'timestamp': datetime.now().isoformat(),
-                'state': state,
-                'action': action
-            }
-            self.current_session.append(record)
+            # Parallel columns instead of a dict per record; records are assembled at save time.
+            # The first state that doesn't fit the columns switches the session to plain state dicts
+            if self._states is None:
+                misfit = _schema_misfit(_SESSION_STATE_SCHEMA, state)
+                if misfit is None:
+                    self._columns.append(state)
+                else:
+                    self.logger.warning(f"State field {misfit!r} doesn't fit the session columns "
+                                        f"({state.get(misfit)!r}), this session will be saved as JSON")
+                    self._states = self._columns.states()
+            if self._states is not None:
+                self._states.append(state)
+            self._timestamps.append(time.perf_counter_ns())
+            self._actions.append(action)
         except Exception as e:
             self.logger.error(f"Error recording state: {e}")
             
     def save_session(self, success: bool = True):
         """Save the current session data"""
         try:
-            if not self.current_session:
+            if not self._actions:
                 return
                 
             # Create session filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"session_{timestamp}_{'success' if success else 'failure'}.json"
-            filepath = os.path.join(self.data_dir, self.game_name, filename)
-            
-            # Save session data
-            with open(filepath, 'w') as f:
-                json.dump({
-                    'game': self.game_name,
-                    'success': success,
-                    'session_start': self.session_start.isoformat(),
-                    'session_end': datetime.now().isoformat(),
-                    'records': self.current_session
-                }, f, indent=2)
+            basename = f"session_{timestamp}_{'success' if success else 'failure'}"
+            session_dir = os.path.join(self.data_dir, self.game_name)
+            meta = {
+                'game': self.game_name,
+                'success': success,
+                'session_start': self.session_start.isoformat(),
+                'session_end': datetime.now().isoformat(),
+            }
+            
+            label_columns = self._label_columns() if self._states is None else None
+            if label_columns is not None:
+                # All records in one binary file; the JSON sidecar only carries the header
+                filepath = os.path.join(session_dir, basename + '.npz')
+                self._save_columnar(filepath, success, label_columns)
+                _dump_json(dict(meta, records=len(self._actions), format='npz'),
+                           os.path.join(session_dir, basename + '.meta.json'))
+            else:
+                # Records that don't fit the fixed columns are kept as full JSON records
+                states = self._states if self._states is not None else self._columns.states()
+                filepath = os.path.join(session_dir, basename + '.json')
+                _dump_json(dict(meta, records=[
+                    {'timestamp': timestamp, 'state': state, 'action': action}
+                    for timestamp, state, action in zip(self._wall_timestamps(), states, self._actions)
+                ]), filepath)
                 
             self.logger.info(f"Saved session data to {filepath}")
-            self.current_session = []
-            self.session_start = datetime.now()
+            self._reset_session()
             
         except Exception as e:
             self.logger.error(f"Error saving session: {e}")
             
+    def _label_columns(self) -> Optional[Dict[str, np.ndarray]]:
+        """Split the recorded actions into typed columns, or None if one doesn't fit _ACTION_SCHEMA"""
+        n = len(self._actions)
+        has_action = np.zeros(n, dtype=np.bool_)
+        action_success = np.zeros(n, dtype=np.bool_)
+        action_code = np.zeros(n, dtype=np.int8)
+        utility_code = np.zeros(n, dtype=np.int8)
+        strategy_code = np.zeros(n, dtype=np.int8)
+        position = np.zeros((n, 2), dtype=np.float64)
+        for i, action in enumerate(self._actions):
+            if not action:
+                continue
+            misfit = _schema_misfit(_ACTION_SCHEMA, action)
+            if misfit is not None:
+                self.logger.warning(f"Action field {misfit!r} doesn't fit the session columns "
+                                    f"({action.get(misfit)!r}), saving this session as JSON")
+                return None
+            has_action[i] = True
+            action_success[i] = action['success']
+            action_code[i] = _ACTION_IDX[action['action']]
+            utility_code[i] = _UTILITY_IDX[action['utility']]
+            strategy_code[i] = _STRATEGY_IDX[action['strategy']]
+            position[i] = action['position']
+        return {
+            'has_action': has_action,
+            'action_success': action_success,
+            'action_code': action_code,
+            'utility_code': utility_code,
+            'strategy_code': strategy_code,
+            'position': position,
+        }
+        
+    def _save_columnar(self, filepath: str, success: bool, label_columns: Dict[str, np.ndarray]):
+        """Write the session's state and label columns to a compressed .npz file"""
+        np.savez_compressed(
+            filepath,
+            success=np.bool_(success),
+            timestamp_ns=np.asarray(self._timestamps, dtype=np.int64) - self._session_start_ns,
+            **self._columns.arrays(),
+            **label_columns
+        )
+        
     def load_training_data(self, min_success_rate: float = 0.5) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Load and process training data from saved sessions"""
         try:
             states = []
             labels = []
             
-            # Get all session files
+            # Get all session files, oldest first
             session_dir = os.path.join(self.data_dir, self.game_name)
-            session_files = [f for f in os.listdir(session_dir) if f.endswith('.json')]
+            session_files = self._session_files(session_dir, min_success_rate)
             
-            for session_file in session_files:
-                with open(os.path.join(session_dir, session_file), 'r') as f:
-                    session_data = json.load(f)
+            if not session_files:
+                return states, labels
+                
+            # Sessions are loaded in parallel so disk reads, which release the GIL, overlap
+            max_workers = min(8, os.cpu_count() or 1, len(session_files))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda f: self._load_one_session(*f, min_success_rate), session_files)
+                for session_states, session_labels in results:
+                    states.extend(session_states)
+                    labels.extend(session_labels)
                     
-                # Only use successful sessions or those above minimum success rate
-                if session_data.get('success', False) or self._calculate_success_rate(session_data) >= min_success_rate:
-                    for record in session_data['records']:
-                        if record.get('action'):  # Only use records with actions
-                            states.append(record['state'])
-                            labels.append(record['action'])
-                            
             return states, labels
             
         except Exception as e:
             self.logger.error(f"Error loading training data: {e}")
             return [], []
             
+    def _load_one_session(self, filename: str, path: str,
+                          min_success_rate: float) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return the (states, labels) a session file contributes to the training set"""
+        if filename.endswith('.npz'):
+            return self._load_columnar_session(path, min_success_rate)
+        if ijson is not None:
+            return self._stream_session(path, filename, min_success_rate)
+            
+        session_data = _load_json(path)
+        states = []
+        labels = []
+        
+        # Only use successful sessions or those above minimum success rate
+        if session_data.get('success', False) or self._calculate_success_rate(session_data) >= min_success_rate:
+            for record in session_data['records']:
+                if record.get('action'):  # Only use records with actions
+                    states.append(record['state'])
+                    labels.append(record['action'])
+        return states, labels
+        
+    def _load_columnar_session(self, path: str,
+                               min_success_rate: float) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Rebuild the state and label dicts of an .npz session from its columns"""
+        with np.load(path) as data:
+            missing = [key for key in _SESSION_NPZ_KEYS if key not in data.files]
+            if missing:
+                self.logger.error(f"Skipping {path}: missing columns {missing}")
+                return [], []
+            columns = {key: data[key] for key in _SESSION_NPZ_KEYS}
+            success = bool(data['success'])
+            
+        # Every column holds one row per record; a short column would misalign all the rows after it
+        meta_path = path[:-len('.npz')] + '.meta.json'
+        records = _load_json(meta_path).get('records') if os.path.exists(meta_path) else None
+        if records is None:
+            records = len(columns['has_action'])
+        lengths = {key: len(column) for key, column in columns.items() if len(column) != records}
+        if lengths:
+            self.logger.error(f"Skipping {path}: expected {records} records, got column lengths {lengths}")
+            return [], []
+            
+        # Only use successful sessions or those above minimum success rate
+        if not (success or (records and columns['action_success'].sum() / records >= min_success_rate)):
+            return [], []
+        rows = np.flatnonzero(columns['has_action'])
+        states = _SessionColumns.to_states({key: column[rows] for key, column in columns.items()})
+        
+        action_code = columns['action_code'][rows].tolist()
+        position = columns['position'][rows].tolist()
+        utility_code = columns['utility_code'][rows].tolist()
+        strategy_code = columns['strategy_code'][rows].tolist()
+        action_success = columns['action_success'][rows].tolist()
+        labels = []
+        for i in range(len(rows)):
+            labels.append({
+                'action': _ACTION_NAMES[action_code[i]],
+                'position': position[i],
+                'utility': _UTILITY_NAMES[utility_code[i]],
+                'strategy': _STRATEGY_NAMES[strategy_code[i]],
+                'success': action_success[i],
+            })
+        return states, labels
+        
+    @staticmethod
+    def _session_files(session_dir: str, min_success_rate: float) -> List[tuple[str, str]]:
+        """List (name, path) of session files worth opening, sorted by modification time"""
+        # A failed session's success rate can never exceed 1.0, so such thresholds rule them out by name
+        skip_failures = min_success_rate > 1.0
+        entries = []
+        with os.scandir(session_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith(('.json', '.npz')) or name.endswith('.meta.json') or not entry.is_file():
+                    continue
+                if skip_failures and name.endswith(('_failure.json', '_failure.npz')):
+                    continue
+                stat = entry.stat()
+                if stat.st_size == 0:  # Interrupted write, nothing to parse
+                    continue
+                entries.append((stat.st_mtime_ns, name, entry.path))
+        entries.sort()
+        return [(name, path) for _, name, path in entries]
+        
+    def _stream_session(self, path: str, filename: str,
+                        min_success_rate: float) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Incrementally parse one session file, keeping only records with actions"""
+        states = []
+        labels = []
+        total = 0
+        successful = 0
+        with open(path, 'rb') as f:
+            # save_session encodes the outcome in the filename; older files need the field itself
+            if filename.endswith('_success.json'):
+                success = True
+            elif filename.endswith('_failure.json'):
+                success = False
+            else:
+                success = bool(next(ijson.items(f, 'success'), False))
+                f.seek(0)
+                
+            for record in ijson.items(f, 'records.item', use_float=True):
+                total += 1
+                action = record.get('action')
+                if action:  # Only use records with actions
+                    states.append(record['state'])
+                    labels.append(action)
+                    if action.get('success', False):
+                        successful += 1
+                        
+        # Only use successful sessions or those above minimum success rate
+        if success or (total and successful / total >= min_success_rate):
+            return states, labels
+        return [], []
+        
     def _calculate_success_rate(self, session_data: Dict[str, Any]) -> float:
         """Calculate success rate for a session"""
         try:
@@ -111,7 +584,7 @@ class GameDataCollector:
         """Preprocess data for training"""
         try:
             # Convert states to feature vectors
-            X = np.array([self._state_to_features(state) for state in states])
+            X = self._states_to_feature_matrix(states)
             
             # Convert labels to target vectors
             y = np.array([self._label_to_target(label) for label in labels])
@@ -122,81 +595,77 @@ class GameDataCollector:
             self.logger.error(f"Error preprocessing data: {e}")
             return np.array([]), np.array([])
             
-    def _state_to_features(self, state: Dict[str, Any]) -> np.ndarray:
-        """Convert state dictionary to feature vector"""
-        features = []
-        
-        # Add basic state features
-        features.extend([
-            float(state.get('combat', False)),
-            float(state.get('utility_available', False)),
-            float(state.get('exposed', False)),
-            float(state.get('player_health', 100) / 100.0),  # Normalize health
-            float(state.get('player_armor', 0) / 100.0)    # Normalize armor
-        ])
-        
-        # Add one-hot encoded features
-        round_time = state.get('round_time', 'mid')
-        round_time_encoding = {
-            'early': [1, 0, 0],
-            'mid': [0, 1, 0],
-            'late': [0, 0, 1]
-        }
-        features.extend(round_time_encoding.get(round_time, [0, 0, 0]))
-        
-        money_state = state.get('team_money', 'medium')
-        money_encoding = {
-            'low': [1, 0, 0],
-            'medium': [0, 1, 0],
-            'high': [0, 0, 1]
-        }
-        features.extend(money_encoding.get(money_state, [0, 0, 0]))
+    def _states_to_feature_matrix(self, states: List[Dict[str, Any]]) -> np.ndarray:
+        """Convert a list of state dictionaries to an (N, 13) float32 feature matrix"""
+        X = np.zeros((len(states), NUM_STATE_FEATURES), dtype=np.float32)
+        if encode_batch is not None and len(states) > 1:
+            _StateColumns.from_states(states).encode(X)
+            return X
+            
+        for i, state in enumerate(states):
+            row = X[i]
+            
+            # Basic state features
+            row[0] = float(state.get('combat', False))
+            row[1] = float(state.get('utility_available', False))
+            row[2] = float(state.get('exposed', False))
+            row[3] = state.get('player_health', 100) / 100.0  # Normalize health
+            row[4] = state.get('player_armor', 0) / 100.0     # Normalize armor
+            
+            # One-hot encoded features; unknown values leave the columns at zero
+            idx = ROUND_TIME_IDX.get(state.get('round_time', 'mid'))
+            if idx is not None:
+                row[ROUND_TIME_OFFSET + idx] = 1.0
+            idx = TEAM_MONEY_IDX.get(state.get('team_money', 'medium'))
+            if idx is not None:
+                row[TEAM_MONEY_OFFSET + idx] = 1.0
+                
+            # Site control and enemy presence
+            row[11] = float(state.get('site_control', False))
+            row[12] = float(state.get('enemy_presence', False))
+        return X
         
-        # Add site control and enemy presence
-        features.extend([
-            float(state.get('site_control', False)),
-            float(state.get('enemy_presence', False))
-        ])
+    def session_feature_matrix(self) -> np.ndarray:
+        """Feature matrix of the current session, built straight from the recorded columns"""
+        if self._states is not None:
+            return self._states_to_feature_matrix(self._states)
+        X = np.zeros((self._columns.n, NUM_STATE_FEATURES), dtype=np.float32)
+        self._columns.encode(X)
+        return X
         
-        return np.array(features)
+    def _state_to_features(self, state: Dict[str, Any]) -> np.ndarray:
+        """Convert state dictionary to feature vector"""
+        return self._states_to_feature_matrix([state])[0]
         
     def _label_to_target(self, label: Dict[str, Any]) -> np.ndarray:
         """Convert label dictionary to target vector"""
-        targets = []
-        
-        # Action target
-        action_idx = {
-            'aim': 0,
-            'utility': 1,
-            'position': 2,
-            'coordinate': 3,
-            'save': 4
-        }.get(label.get('action', ''), 0)
-        targets.append(action_idx)
+        position = label.get('position', [0, 0])
+        n_pos = len(position)
+        # [action, *position, utility, strategy]; float32 because positions may be fractional
+        target = np.empty(n_pos + 3, dtype=np.float32)
+        target[0] = _ACTION_IDX.get(label.get('action', ''), 0)
+        target[1:n_pos + 1] = position
+        target[n_pos + 1] = _UTILITY_IDX.get(label.get('utility', ''), 0)
+        target[n_pos + 2] = _STRATEGY_IDX.get(label.get('strategy', ''), 0)
+        return target
         
-        # Position target
-        targets.extend(label.get('position', [0, 0]))
+    def _wall_timestamps(self) -> List[str]:
+        """Convert the recorded monotonic timestamps to ISO wall-clock strings"""
+        start = self.session_start
+        start_ns = self._session_start_ns
+        return [(start + timedelta(microseconds=(ns - start_ns) // 1000)).isoformat()
+                for ns in self._timestamps]
         
-        # Utility target
-        utility_idx = {
-            'flash': 0,
-            'smoke': 1,
-            'molly': 2,
-            'save': 3
-        }.get(label.get('utility', ''), 0)
-        targets.append(utility_idx)
-        
-        # Strategy target
-        strategy_idx = {
-            'aggressive': 0,
-            'defensive': 1,
-            'team_push': 2
-        }.get(label.get('strategy', ''), 0)
-        targets.append(strategy_idx)
-        
-        return np.array(targets)
-
     def clear_session(self):
         """Clear current session data"""
-        self.current_session = []
+        self._reset_session()
+        
+    def _reset_session(self):
+        """Start a new, empty session"""
+        self._timestamps = []
+        self._actions = []
+        self._columns = _SessionColumns()
+        self._states = None  # Recorded state dicts, once a state didn't fit the columns
+        # Records store perf_counter_ns(); this pair maps them back to wall-clock time on save
         self.session_start = datetime.now()
+        self._session_start_ns = time.perf_counter_ns()
@@ -0,0 +1,60 @@
+from enum import IntEnum
+from typing import Any, Dict, Type
+
+class RoundTime(IntEnum):
+    early = 0
+    mid = 1
+    late = 2
+
+class TeamMoney(IntEnum):
+    low = 0
+    medium = 1
+    high = 2
+
+class Action(IntEnum):
+    aim = 0
+    utility = 1
+    position = 2
+    coordinate = 3
+    save = 4
+
+class Utility(IntEnum):
+    flash = 0
+    smoke = 1
+    molly = 2
+    save = 3
+
+class Strategy(IntEnum):
+    aggressive = 0
+    defensive = 1
+    team_push = 2
+
+class Gun(IntEnum):
+    Melee = 0
+    Classic = 1
+    Shorty = 2
+    Frenzy = 3
+    Ghost = 4
+    Sheriff = 5
+    Stinger = 6
+    Spectre = 7
+    Bucky = 8
+    Judge = 9
+    Bulldog = 10
+    Guardian = 11
+    Phantom = 12
+    Vandal = 13
+    Marshal = 14
+    Outlaw = 15
+    Operator = 16
+    Ares = 17
+    Odin = 18
+
+def code_table(enum_cls: Type[IntEnum]) -> Dict[Any, int]:
+    """Lookup table from member names and members (or their int values) to integer codes.
+
+    Enum members hash as plain ints, so producers that already hold members skip string hashing.
+    """
+    table = {member.name: int(member) for member in enum_cls}
+    table.update({int(member): int(member) for member in enum_cls})
+    return table
@@ -3,12 +3,40 @@ from PyQt6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, QRectF
 from PyQt6.QtGui import QFont, QIcon, QColor, QPainter, QPainterPath, QPalette
 import logging
+import os
 from PyQt6.QtMultimedia import QSoundEffect
 from PyQt6.QtCore import QUrl
-import os
-import json
+from . import settings_store
 from .settings_dialog import SettingsDialog
 
+# Content frame stylesheet, parsed once; suggestion labels pick their look through the
+# dynamic "priority" property instead of per-label stylesheets
+_CONTENT_STYLE = """
+    QFrame {
+        background-color: rgba(30, 30, 30, 0.6);
+        border-radius: 10px;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+    }
+    QLabel {
+        color: white;
+        background-color: rgba(40, 40, 40, 0.9);
+        padding: 12px;
+        border-radius: 8px;
+        margin-bottom: 8px;
+        font-size: 12px;
+    }
+    QLabel[priority="1"] {
+        background-color: rgba(220, 53, 69, 0.9);
+        font-weight: bold;
+    }
+    QLabel[priority="2"] {
+        background-color: rgba(255, 193, 7, 0.9);
+    }
+"""
+
+# Short notification beep shipped next to this module
+CRITICAL_SOUND_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sounds', 'beep.wav')
+
 class OverlayWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -16,6 +44,10 @@ class OverlayWindow(QWidget):
         self.settings = self.load_settings()
         self.is_minimized = False
         self.oldPos = None  # Initialize oldPos
+        self._last_sig = None  # (text, priority) pairs currently on display
+        self._cached_path = None  # Rounded background shape, rebuilt on resize
+        self._bg_color = None  # Background fill, refreshed on theme change
+        self._settings_dialog = None  # Built on first use and reused afterwards
         self.setup_ui()
         self.setup_sounds()
         self.apply_settings()
@@ -32,9 +64,9 @@ class OverlayWindow(QWidget):
         }
         
         try:
-            if os.path.exists('settings.json'):
-                with open('settings.json', 'r') as f:
-                    return json.load(f)
+            settings = settings_store.load()
+            if settings is not None:
+                return settings
         except Exception as e:
             self.logger.error(f"Error loading settings: {e}")
             
@@ -53,6 +85,7 @@ class OverlayWindow(QWidget):
                 self.apply_light_theme()
             elif theme == 'Dark':
                 self.apply_dark_theme()
+            self._bg_color = None
             
             # Apply sound settings
             if self.critical_sound:
@@ -102,13 +135,28 @@ class OverlayWindow(QWidget):
     def setup_sounds(self):
         """Setup sound effects for notifications"""
         try:
-            # Use system beep instead of WAV file
+            if not os.path.exists(CRITICAL_SOUND_PATH):
+                self.logger.error(f"Critical sound not found: {CRITICAL_SOUND_PATH}")
             self.critical_sound = QSoundEffect()
-            self.critical_sound.setSource(QUrl.fromLocalFile(":/sounds/beep.wav"))
+            self.critical_sound.setLoopCount(1)
+            # Decoding happens once in the background; play() is skipped until the PCM is loaded
+            self.critical_sound.statusChanged.connect(self._on_sound_status)
+            self.critical_sound.setSource(QUrl.fromLocalFile(CRITICAL_SOUND_PATH))
             self.critical_sound.setVolume(0.5)
         except Exception as e:
             self.logger.error(f"Error setting up sounds: {e}")
             self.critical_sound = None
+            
+    def _on_sound_status(self):
+        """Report whether the critical sound finished loading"""
+        sound = self.critical_sound
+        if sound is None:
+            return
+        status = sound.status()
+        if status == QSoundEffect.Status.Error:
+            self.logger.error(f"Could not load critical sound: {sound.source().toString()}")
+        elif status == QSoundEffect.Status.Ready:
+            self.logger.debug("Critical sound loaded")
         
     def setup_ui(self):
         """Setup the overlay UI"""
@@ -163,13 +211,7 @@ class OverlayWindow(QWidget):
             
             # Create content frame
             self.content_frame = QFrame()
-            self.content_frame.setStyleSheet("""
-                QFrame {
-                    background-color: rgba(30, 30, 30, 0.6);
-                    border-radius: 10px;
-                    border: 1px solid rgba(255, 255, 255, 0.1);
-                }
-            """)
+            self.content_frame.setStyleSheet(_CONTENT_STYLE)
             content_layout = QVBoxLayout()
             content_layout.setContentsMargins(10, 10, 10, 10)
             content_layout.setSpacing(8)
@@ -179,16 +221,7 @@ class OverlayWindow(QWidget):
             self.suggestion_labels = []
             for _ in range(3):  # Create 3 labels for top 3 suggestions
                 label = QLabel()
-                label.setStyleSheet("""
-                    QLabel {
-                        color: white;
-                        background-color: rgba(40, 40, 40, 0.9);
-                        padding: 12px;
-                        border-radius: 8px;
-                        margin-bottom: 8px;
-                        font-size: 12px;
-                    }
-                """)
+                label.setProperty('priority', 3)
                 label.setFont(QFont('Segoe UI', 12))
                 label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
                 label.setWordWrap(True)
@@ -221,9 +254,13 @@ class OverlayWindow(QWidget):
             
     def show_settings(self):
         """Show settings dialog"""
-        dialog = SettingsDialog(self)
-        dialog.settings_changed.connect(self.on_settings_changed)
-        dialog.exec()
+        if self._settings_dialog is None:
+            self._settings_dialog = SettingsDialog(self)
+            self._settings_dialog.settings_changed.connect(self.on_settings_changed)
+        else:
+            # Reset every field, discarding edits from a cancelled session
+            self._settings_dialog.load_settings()
+        self._settings_dialog.exec()
         
     def on_settings_changed(self, new_settings):
         """Handle settings changes"""
@@ -245,67 +282,61 @@ class OverlayWindow(QWidget):
     def update_suggestions(self, suggestions: list):
         """Update the suggestion display"""
         try:
-            self.logger.info(f"Overlay displaying {len(suggestions)} suggestions: {[{'text': s.get('text'), 'priority': s.get('priority')} for s in suggestions]}")
-            if not self.suggestion_labels:
-                return
-                
-            # Clear all labels first
-            for label in self.suggestion_labels:
-                label.setText("")
-                label.setStyleSheet("""
-                    QLabel {
-                        color: white;
-                        background-color: rgba(40, 40, 40, 0.9);
-                        padding: 12px;
-                        border-radius: 8px;
-                        margin-bottom: 8px;
-                        font-size: 12px;
-                    }
-                """)
-            
-            # Update labels with new suggestions
-            for i, suggestion in enumerate(suggestions):
-                if i < len(self.suggestion_labels):
-                    label = self.suggestion_labels[i]
-                    label.setText(suggestion.get('text', ''))
-                    
-                    # Apply different styles based on priority
-                    priority = suggestion.get('priority', 3)
-                    if priority == 1:
-                        label.setStyleSheet("""
-                            QLabel {
-                                color: white;
-                                background-color: rgba(220, 53, 69, 0.9);
-                                padding: 12px;
-                                border-radius: 8px;
-                                margin-bottom: 8px;
-                                font-size: 12px;
-                                font-weight: bold;
-                            }
-                        """)
-                    elif priority == 2:
-                        label.setStyleSheet("""
-                            QLabel {
-                                color: white;
-                                background-color: rgba(255, 193, 7, 0.9);
-                                padding: 12px;
-                                border-radius: 8px;
-                                margin-bottom: 8px;
-                                font-size: 12px;
-                            }
-                        """)
-                    
-                    # Play sound for high priority suggestions
-                    if priority == 1 and self.critical_sound and self.settings.get('sound_enabled', True):
-                        self.critical_sound.play()
-            
             # Show the window if it was hidden
             if not self.isVisible():
                 self.show()
+
+            if not self.suggestion_labels:
+                return
+
+            # Most ticks repeat the previous suggestions; leave the labels alone then
+            sig = tuple((s.get('text', ''), s.get('priority', 3)) for s in suggestions)
+            if sig == self._last_sig:
+                return
+            self._last_sig = sig
+
+            self.logger.info("Overlay suggestions changed (%d shown)", len(suggestions))
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Overlay displaying %d suggestions: %s", len(suggestions),
+                                  [{'text': text, 'priority': priority} for text, priority in sig])
+                
+            # Pad with empty rows so leftover labels get cleared
+            rows = list(sig[:len(self.suggestion_labels)])
+            rows.extend([('', 3)] * (len(self.suggestion_labels) - len(rows)))
+
+            # Coalesce all text and style changes into a single repaint of the content frame
+            self.content_frame.setUpdatesEnabled(False)
+            try:
+                # Set all texts before any styles so Qt doesn't re-layout between the two
+                for label, (text, _) in zip(self.suggestion_labels, rows):
+                    if label.text() != text:
+                        label.setText(text)
+
+                # Apply different styles based on priority
+                for label, (_, priority) in zip(self.suggestion_labels, rows):
+                    self._set_label_priority(label, priority)
+            finally:
+                self.content_frame.setUpdatesEnabled(True)
+                self.content_frame.update()
+
+            # Play sound for high priority suggestions
+            if self.settings.get('sound_enabled', True) and any(priority == 1 for _, priority in rows):
+                sound = self.critical_sound
+                if sound is not None and sound.isLoaded():
+                    sound.play()
                 
         except Exception as e:
             self.logger.error(f"Error updating suggestions: {e}")
             
+    @staticmethod
+    def _set_label_priority(label: QLabel, priority: int):
+        """Switch a label's priority style by re-polishing it, without re-parsing any QSS"""
+        if label.property('priority') != priority:
+            label.setProperty('priority', priority)
+            style = label.style()
+            style.unpolish(label)
+            style.polish(label)
+            
     def mousePressEvent(self, event):
         """Handle mouse press for dragging"""
         self.oldPos = event.globalPosition().toPoint()
@@ -316,22 +347,31 @@ class OverlayWindow(QWidget):
         self.move(self.x() + delta.x(), self.y() + delta.y())
         self.oldPos = event.globalPosition().toPoint()
         
+    def resizeEvent(self, event):
+        """Drop the cached background path so it matches the new size"""
+        self._cached_path = None
+        super().resizeEvent(event)
+        
     def paintEvent(self, event):
         """Custom paint event for rounded corners and transparency"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         # Create path for rounded rectangle
-        path = QPainterPath()
-        rect = QRectF(self.rect())  # Convert QRect to QRectF
-        path.addRoundedRect(rect, 10, 10)
+        if self._cached_path is None:
+            path = QPainterPath()
+            rect = QRectF(self.rect())  # Convert QRect to QRectF
+            path.addRoundedRect(rect, 10, 10)
+            self._cached_path = path
+        if self._bg_color is None:
+            self._bg_color = self.palette().color(QPalette.ColorRole.Window)
         
         # Set up painter for transparency
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(self.palette().color(QPalette.ColorRole.Window))
+        painter.setBrush(self._bg_color)
         
         # Draw the rounded rectangle
-        painter.drawPath(path)
+        painter.drawPath(self._cached_path)
         
         # Draw the content
         super().paintEvent(event)
@@ -1,18 +1,27 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QCheckBox, QSlider, QComboBox,
                             QGroupBox, QSpinBox, QColorDialog)
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QColor
-import json
-import os
+from . import settings_store
 
 class SettingsDialog(QDialog):
     # Signal to notify overlay of settings changes
     settings_changed = pyqtSignal(dict)
+
+    # Slider drags emit many values per second; only forward the last one after this pause
+    DEBOUNCE_MS = 75
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, live_preview: bool = False):
         super().__init__(parent)
         self.setWindowTitle("AI Game Assistant Settings")
+        # Without live preview the overlay is only updated once, with the full dict on save
+        self._live_preview = live_preview
+        self._custom_color = None
+        self._pending = None
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._emit_pending)
         self.setup_ui()
         self.load_settings()
         
@@ -119,22 +128,25 @@ class SettingsDialog(QDialog):
         self.setMinimumWidth(400)
         
     def load_settings(self):
-        """Load settings from file"""
+        """Reset the dialog from the saved settings (or the defaults if there are none)"""
+        # The dialog is reused, so drop anything left over from a cancelled session
+        self._debounce.stop()
+        self._pending = None
+        settings = {}
         try:
-            if os.path.exists('settings.json'):
-                with open('settings.json', 'r') as f:
-                    settings = json.load(f)
-                    
-                # Apply loaded settings
-                self.transparency_slider.setValue(settings.get('transparency', 80))
-                self.theme_combo.setCurrentText(settings.get('theme', 'Dark'))
-                self.sound_checkbox.setChecked(settings.get('sound_enabled', True))
-                self.volume_slider.setValue(settings.get('volume', 50))
-                self.game_combo.setCurrentText(settings.get('game', 'Valorant'))
-                self.interval_spin.setValue(settings.get('update_interval', 1000))
+            settings = settings_store.load() or {}
         except Exception as e:
             print(f"Error loading settings: {e}")
             
+        # Apply loaded settings
+        self.transparency_slider.setValue(settings.get('transparency', 80))
+        self.theme_combo.setCurrentText(settings.get('theme', 'Dark'))
+        self.sound_checkbox.setChecked(settings.get('sound_enabled', True))
+        self.volume_slider.setValue(settings.get('volume', 50))
+        self.game_combo.setCurrentText(settings.get('game', 'Valorant'))
+        self.interval_spin.setValue(settings.get('update_interval', 1000))
+        self._custom_color = settings.get('custom_color')
+            
     def save_settings(self):
         """Save settings to file"""
         settings = {
@@ -145,10 +157,11 @@ class SettingsDialog(QDialog):
             'game': self.game_combo.currentText(),
             'update_interval': self.interval_spin.value()
         }
+        if self._custom_color is not None:
+            settings['custom_color'] = self._custom_color
         
         try:
-            with open('settings.json', 'w') as f:
-                json.dump(settings, f)
+            settings_store.save(settings)
             self.settings_changed.emit(settings)
             self.accept()
         except Exception as e:
@@ -156,14 +169,26 @@ class SettingsDialog(QDialog):
             
     def on_transparency_changed(self, value):
         """Handle transparency slider change"""
-        self.settings_changed.emit({'transparency': value})
+        if not self._live_preview:
+            return
+        self._pending = {'transparency': value}
+        self._debounce.start(self.DEBOUNCE_MS)
+        
+    def _emit_pending(self):
+        """Emit the latest debounced setting change"""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self.settings_changed.emit(pending)
         
     def on_theme_changed(self, theme):
         """Handle theme selection change"""
-        self.settings_changed.emit({'theme': theme})
+        if self._live_preview:
+            self.settings_changed.emit({'theme': theme})
         
     def show_color_dialog(self):
         """Show color picker dialog"""
         color = QColorDialog.getColor()
         if color.isValid():
-            self.settings_changed.emit({'custom_color': color.name()}) 
\ No newline at end of file
+            self._custom_color = color.name()
+            if self._live_preview:
+                self.settings_changed.emit({'custom_color': self._custom_color}) 
\ No newline at end of file
@@ -0,0 +1,30 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+SETTINGS_PATH = 'settings.json'
+
+# Parsed settings.json shared by the overlay and the settings dialog, keyed by the file's mtime
+_SETTINGS_CACHE = {'path': None, 'mtime': None, 'data': None}
+
+def load(path: str = SETTINGS_PATH) -> Optional[Dict[str, Any]]:
+    """Return a copy of the saved settings, or None if there is no settings file.
+
+    The file is only re-read and parsed when its modification time changes.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _SETTINGS_CACHE['path'] != path or _SETTINGS_CACHE['mtime'] != mtime:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        _SETTINGS_CACHE.update(path=path, mtime=mtime, data=data)
+    return dict(_SETTINGS_CACHE['data'])
+
+def save(settings: Dict[str, Any], path: str = SETTINGS_PATH):
+    """Write settings to disk and refresh the cache so the next load skips the read"""
+    with open(path, 'w') as f:
+        json.dump(settings, f)
+    _SETTINGS_CACHE.update(path=path, mtime=os.stat(path).st_mtime_ns, data=dict(settings))